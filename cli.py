@@ -1,8 +1,21 @@
 import click
+import contextlib
+import functools
+import hashlib
 import subprocess
+import sys
 import tempfile
+import threading
 import os
-from src.compiler import compile_tc_to_nasm
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import shutil
+from pathlib import Path
+
+CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "tinycompiled"
+)
+# Entries kept per cache directory (NASM output, executables); the oldest go first
+CACHE_MAX_ENTRIES = 256
 
 
 @click.group()
@@ -11,22 +24,173 @@ def cli():
     pass
 
 
-def compile_to_nasm(input_file, output_file=None, verbose=False, debug=False, stdout=False):
+def _readable_files(ctx, param, value):
+    """Click callback: fail early unless every given input file can be read.
+
+    One os.access call per file, cheaper than click.Path's stat-based existence check.
+    """
+    for path in (value,) if isinstance(value, str) else value:
+        if not os.access(path, os.R_OK):
+            raise click.BadParameter(f"File '{path}' does not exist or is not readable.")
+    return value
+
+
+def _read_source(path):
+    """Read a source file as bytes, in blocks of the filesystem's preferred size."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        block_size = os.fstat(fd).st_blksize or 65536
+        chunks = []
+        while chunk := os.read(fd, block_size):
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    return b"".join(chunks)
+
+
+# The modules that decide the generated NASM, relative to this file
+COMPILER_SOURCES = (
+    "src/lexer/keyword.py",
+    "src/lexer/token.py",
+    "src/lexer/lexer.py",
+    "src/ast/node.py",
+    "src/parser/parser.py",
+    "src/generator/nasm_generator.py",
+    "src/compiler/compiler.py",
+)
+
+
+@functools.cache
+def _compiler_fingerprint():
+    """Identify the compiler sources so cached output is dropped when they change.
+
+    Stats a fixed list of files rather than walking src/, once per process.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    root = os.path.dirname(os.path.abspath(__file__))
+    for name in COMPILER_SOURCES:
+        stat = os.stat(os.path.join(root, name))
+        digest.update(f"{name}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+    return digest.digest()
+
+
+def _cache_path(src_bytes):
+    """Return the cache file for the NASM output of the given source."""
+    key = hashlib.blake2b(src_bytes, digest_size=16, person=b"tc-nasm")
+    key.update(_compiler_fingerprint())
+    return CACHE_DIR / f"{key.hexdigest()}.asm"
+
+
+def _toolchain_fingerprint():
+    """Identify the installed NASM and LD so cached executables are dropped when they change."""
+    digest = hashlib.blake2b(digest_size=16)
+    for tool in ("nasm", "ld"):
+        path = os.path.realpath(_which(tool))
+        stat = os.stat(path)
+        digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+    return digest.digest()
+
+
+def _exe_cache_path(nasm_code):
+    """Return the cache file for the executable linked from the given NASM code."""
+    key = hashlib.blake2b(nasm_code.encode(), digest_size=16, person=b"tc-elf")
+    key.update(_toolchain_fingerprint())
+    return CACHE_DIR / "bin" / f"{key.hexdigest()}.elf"
+
+
+def _write_cache(cache_file, data):
+    """Store bytes in the cache atomically; a failing cache never fails the build."""
+    tmp = None
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file first so concurrent runs never see a partial entry
+        with tempfile.NamedTemporaryFile(
+            dir=cache_file.parent, suffix=".tmp", delete=False
+        ) as tmp:
+            tmp.write(data)
+        os.replace(tmp.name, cache_file)
+        _prune_cache(cache_file.parent)
+    except OSError:
+        if tmp is not None:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp.name)
+
+
+def _prune_cache(directory):
+    """Delete the oldest entries once a cache directory holds more than CACHE_MAX_ENTRIES.
+
+    Only runs after a miss has been written, so cache hits never pay for it.
+    """
+    with os.scandir(directory) as it:
+        entries = [entry for entry in it if entry.is_file() and not entry.name.endswith(".tmp")]
+    if len(entries) <= CACHE_MAX_ENTRIES:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+    for entry in entries[: len(entries) - CACHE_MAX_ENTRIES]:
+        with contextlib.suppress(OSError):
+            os.unlink(entry.path)
+
+
+def compile_cached(src_bytes, debug=False):
+    """Compile TinyCompiled source, reusing NASM output cached on disk.
+
+    Debug runs always go through the full pipeline so tokens and AST get printed.
+    """
+    if debug:
+        from src.compiler import compile_tc_to_nasm_bytes
+
+        return compile_tc_to_nasm_bytes(src_bytes, debug=True)
+
+    cache_file = _cache_path(src_bytes)
+    try:
+        # Entries are written as UTF-8, whatever the locale; an unreadable one is a miss
+        return cache_file.read_bytes().decode("utf-8")
+    except (OSError, UnicodeDecodeError):
+        pass
+
+    # Imported lazily: cache hits and --help never need the compiler itself
+    from src.compiler import compile_tc_to_nasm_bytes
+
+    nasm_code = compile_tc_to_nasm_bytes(src_bytes, debug=False)
+    _write_cache(cache_file, nasm_code.encode())
+    return nasm_code
+
+
+def compile_profiled(src_bytes, debug=False, limit=25):
+    """Compile without the cache under cProfile and print the hottest calls to stderr."""
+    import cProfile
+    import pstats
+    from src.compiler import compile_tc_to_nasm_bytes
+
+    profiler = cProfile.Profile()
+    nasm_code = profiler.runcall(compile_tc_to_nasm_bytes, src_bytes, debug=debug)
+    pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(limit)
+    return nasm_code
+
+
+def compile_to_nasm(input_file, output_file=None, verbose=False, debug=False, stdout=False, profile=False):
     """Compile TinyCompiled source to NASM assembly."""
     try:
-        with open(input_file, 'r') as f:
-            source_code = f.read()
+        source_code = _read_source(input_file)
 
         if verbose:
             click.echo(f"Compiling {input_file}")
 
-        nasm_code = compile_tc_to_nasm(source_code, debug=debug)
+        if profile:
+            nasm_code = compile_profiled(source_code, debug=debug)
+        else:
+            nasm_code = compile_cached(source_code, debug=debug)
 
         if stdout or output_file is None:
-            click.echo(nasm_code)
+            # Encoded once and written straight to the byte stream, rather than
+            # click.echo's text-stream handling of the whole listing
+            sys.stdout.buffer.write(nasm_code.encode())
+            sys.stdout.buffer.write(b"\n")
+            sys.stdout.buffer.flush()
         else:
-            with open(output_file, 'w') as f:
-                f.write(nasm_code)
+            # Encoded once and handed to the OS in a single write, like the stdout path
+            with open(output_file, 'wb') as f:
+                f.write(nasm_code.encode())
             if verbose:
                 click.echo(f"NASM code written to {output_file}")
 
@@ -38,27 +202,148 @@ def compile_to_nasm(input_file, output_file=None, verbose=False, debug=False, st
         raise
 
 
-def build_executable(input_file, output_file, verbose=False, debug=False):
-    """Compile TinyCompiled source to executable."""
-    temp_asm = tempfile.NamedTemporaryFile(mode='w', suffix='.asm', delete=False)
-    temp_o = tempfile.NamedTemporaryFile(suffix='.o', delete=False)
+def _scratch_dir():
+    """Pick a directory for intermediate build files, preferring tmpfs."""
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return None
+
+
+# memfds kept open for reuse, so repeated builds in one process (build-many, the
+# GUI) don't create and free a file for every intermediate .asm/.o
+_memfd_pool = []
+_memfd_pool_lock = threading.Lock()
+
+
+def _acquire_memfd():
+    """Take an empty memfd from the pool, creating one if the pool is empty."""
+    with _memfd_pool_lock:
+        fd = _memfd_pool.pop() if _memfd_pool else None
+    if fd is None:
+        return os.memfd_create("tinycompiled")
+    os.ftruncate(fd, 0)
+    os.lseek(fd, 0, os.SEEK_SET)
+    return fd
 
+
+def _release_memfd(fd):
+    """Return a memfd to the pool."""
+    with _memfd_pool_lock:
+        _memfd_pool.append(fd)
+
+
+@contextlib.contextmanager
+def _scratch_file(suffix, data=b""):
+    """Yield (path, fds) for an intermediate build file, kept in memory where possible.
+
+    On Linux this is a memfd that child processes open as /dev/fd/N (the fds must be
+    passed to them). Unlike a stdin pipe it can be reopened, which NASM may do per pass.
+    """
+    if hasattr(os, "memfd_create"):
+        fd = _acquire_memfd()
+        try:
+            with os.fdopen(fd, "wb", closefd=False) as f:
+                f.write(data)
+            yield f"/dev/fd/{fd}", (fd,)
+        finally:
+            _release_memfd(fd)
+        return
+
+    temp = tempfile.NamedTemporaryFile(suffix=suffix, dir=_scratch_dir(), delete=False)
     try:
-        # Compile to NASM
-        # Since we need the asm, compile to temp
-        nasm_code = compile_tc_to_nasm(open(input_file).read(), debug=debug)
-        temp_asm.write(nasm_code)
-        temp_asm.close()
+        temp.write(data)
+        temp.close()
+        yield temp.name, ()
+    finally:
+        temp.close()
+        if os.path.exists(temp.name):
+            os.unlink(temp.name)
+
+
+@functools.cache
+def _which(tool):
+    """Resolve a build tool to an absolute path once per process."""
+    path = shutil.which(tool)
+    if path is None:
+        raise FileNotFoundError(f"{tool} not found on PATH")
+    return path
 
+
+def _spawn(args, fds=()):
+    """Run a command to completion like subprocess.run(check=True), via posix_spawn.
+
+    subprocess falls back to fork() whenever pass_fds is given, which copies the page
+    tables of the whole (Click/Textual-sized) interpreter. posix_spawn avoids that; the
+    scratch fds are handed over by dup2-ing each onto itself, which clears close-on-exec
+    in the child only.
+    """
+    file_actions = [(os.POSIX_SPAWN_DUP2, fd, fd) for fd in fds]
+    pid = os.posix_spawn(_which(args[0]), args, os.environ, file_actions=file_actions)
+    returncode = os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1])
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, args)
+
+
+def _assemble_and_link(nasm_code, output_file, verbose=False):
+    """Run NASM and LD on generated assembly to produce an executable."""
+    with (
+        _scratch_file(".asm", nasm_code.encode()) as (asm_path, asm_fds),
+        _scratch_file(".o") as (obj_path, obj_fds),
+    ):
         # Assemble
         if verbose:
-            click.echo(f"Assembling {temp_asm.name} to {temp_o.name}")
-        subprocess.run(['nasm', '-f', 'elf64', '-o', temp_o.name, temp_asm.name], check=True)
+            click.echo(f"Assembling {asm_path} to {obj_path}")
+        _spawn(['nasm', '-f', 'elf64', '-o', obj_path, asm_path], asm_fds + obj_fds)
 
         # Link
         if verbose:
-            click.echo(f"Linking {temp_o.name} to {output_file}")
-        subprocess.run(['ld', temp_o.name, '-o', output_file], check=True)
+            click.echo(f"Linking {obj_path} to {output_file}")
+        _spawn(['ld', obj_path, '-o', output_file], obj_fds)
+
+
+def _fast_copy(src, dst):
+    """Copy a file inside the kernel where supported, else with shutil."""
+    if not hasattr(os, "copy_file_range"):
+        shutil.copyfile(src, dst)
+        return
+
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            remaining = os.fstat(src_fd).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(src_fd, dst_fd, remaining)
+                if copied == 0:
+                    # Short copy, e.g. the source shrank; never leave a truncated file
+                    raise OSError(f"copy_file_range stopped with {remaining} bytes left")
+                remaining -= copied
+        except OSError:
+            # e.g. EXDEV on older kernels, a filesystem without support, or a short copy
+            shutil.copyfile(src, dst)
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+
+
+def build_executable(input_file, output_file, verbose=False, debug=False):
+    """Compile TinyCompiled source to executable."""
+    try:
+        # Compile to NASM
+        nasm_code = compile_cached(_read_source(input_file), debug=debug)
+
+        # NASM and LD are deterministic, so identical assembly links to an identical binary
+        cached_exe = _exe_cache_path(nasm_code)
+        if cached_exe.exists():
+            if verbose:
+                click.echo(f"Using cached executable {cached_exe}")
+            _fast_copy(cached_exe, output_file)
+            os.chmod(output_file, 0o755)
+            return
+
+        _assemble_and_link(nasm_code, output_file, verbose)
+        _write_cache(cached_exe, Path(output_file).read_bytes())
 
         if verbose:
             click.echo("Build successful")
@@ -69,19 +354,43 @@ def build_executable(input_file, output_file, verbose=False, debug=False):
     except Exception as e:
         click.echo(f"Build failed: {e}", err=True)
         raise
-    finally:
-        if os.path.exists(temp_asm.name):
-            os.unlink(temp_asm.name)
-        if os.path.exists(temp_o.name):
-            os.unlink(temp_o.name)
+
+
+def build_many(input_files, out_dir, jobs=None, verbose=False):
+    """Build several TinyCompiled sources in parallel.
+
+    Each build spends its time waiting on NASM and LD, so a thread pool is enough to
+    keep one file assembling while another links. Returns the executable paths.
+    """
+    outputs = [os.path.join(out_dir, Path(f).stem) for f in input_files]
+    # Sources with the same name would be built concurrently into the same executable
+    sources_by_output = {}
+    for src, out in zip(input_files, outputs):
+        if out in sources_by_output:
+            raise click.UsageError(
+                f"'{sources_by_output[out]}' and '{src}' would both be built to '{out}'."
+            )
+        sources_by_output[out] = src
+    os.makedirs(out_dir, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        futures = [
+            executor.submit(build_executable, src, out, verbose)
+            for src, out in zip(input_files, outputs)
+        ]
+        for future in as_completed(futures):
+            future.result()
+
+    return outputs
 
 
 @cli.command()
-@click.argument("input_file", type=click.Path(exists=True))
+@click.argument("input_file", type=click.Path(), callback=_readable_files)
 @click.argument("output_file", type=click.Path(), required=False)
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose output.")
 @click.option("--debug", is_flag=True, help="Show debug information including tokens and AST during compilation.")
-def compile(input_file, output_file, verbose, debug):
+@click.option("--profile", is_flag=True, help="Profile the compiler (bypassing the cache) and print the hottest calls to stderr.")
+def compile(input_file, output_file, verbose, debug, profile):
     """Compile TinyCompiled source to NASM assembly.
 
     Compiles the given TinyCompiled source file to NASM x86-64 assembly code.
@@ -89,11 +398,11 @@ def compile(input_file, output_file, verbose, debug):
     INPUT_FILE: Path to the TinyCompiled source file (.tc)
     OUTPUT_FILE: Path to write the NASM assembly file (.asm). If not provided, outputs to stdout.
     """
-    compile_to_nasm(input_file, output_file, verbose, debug)
+    compile_to_nasm(input_file, output_file, verbose, debug, profile=profile)
 
 
 @cli.command()
-@click.argument("input_file", type=click.Path(exists=True))
+@click.argument("input_file", type=click.Path(), callback=_readable_files)
 @click.argument("output_file", type=click.Path())
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose output.")
 @click.option("--debug", is_flag=True, help="Show debug information including tokens and AST during compilation.")
@@ -109,8 +418,24 @@ def build(input_file, output_file, verbose, debug):
     build_executable(input_file, output_file, verbose, debug)
 
 
+@cli.command(name="build-many")
+@click.argument("input_files", nargs=-1, required=True, type=click.Path(), callback=_readable_files)
+@click.option("--out-dir", "-o", type=click.Path(file_okay=False), default=".", help="Directory to write the executables to.")
+@click.option("--jobs", "-j", type=int, help="Number of parallel builds. Defaults to the CPU count.")
+@click.option("--verbose", "-v", is_flag=True, help="Enable verbose output.")
+def build_many_command(input_files, out_dir, jobs, verbose):
+    """Compile several TinyCompiled sources to executables in parallel.
+
+    Each executable is named after its source file, without the extension.
+    Requires NASM and LD to be installed.
+
+    INPUT_FILES: Paths to the TinyCompiled source files (.tc)
+    """
+    build_many(input_files, out_dir, jobs, verbose)
+
+
 @cli.command()
-@click.argument("input_file", type=click.Path(exists=True))
+@click.argument("input_file", type=click.Path(), callback=_readable_files)
 @click.option("--output", type=click.Path(), help="Optional path to save the executable file. If not provided, a temporary executable is used and deleted after running.")
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose output.")
 @click.option("--debug", is_flag=True, help="Show debug information including tokens and AST during compilation.")
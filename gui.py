@@ -1,3 +1,4 @@
+from textual import work
 from textual.app import App, ComposeResult
 from textual.binding import Binding
 from textual.containers import Horizontal, Container, Vertical
@@ -11,10 +12,10 @@ from textual.widgets import (
 )
 from textual.reactive import var
 from textual.screen import ModalScreen
+from textual.timer import Timer
+from textual.worker import get_current_worker
 from pathlib import Path
 
-from src import compile_tc_to_nasm
-
 
 class CustomTextArea(TextArea):
     """TextArea with explicit Ctrl+A binding for select all."""
@@ -46,9 +47,7 @@ class SaveDialog(ModalScreen[tuple[str, str]]):
                 yield Label("📁 Select directory (↑ to go up):", id="dir-label")
                 yield DirectoryTree(str(self.selected_dir), id="dir-tree")
 
-                yield Label(
-                    f"Current: {self.selected_dir.absolute()}", id="current-dir"
-                )
+                yield Label(f"Current: {self.selected_dir}", id="current-dir")
 
                 yield Input(
                     placeholder="filename.tc or filename.asm",
@@ -68,16 +67,21 @@ class SaveDialog(ModalScreen[tuple[str, str]]):
         """Navigate to parent directory."""
         parent = self.selected_dir.parent
         if parent != self.selected_dir:  # Not at root
-            self.selected_dir = parent
+            self.set_selected_dir(parent)
             self.refresh_directory_tree()
 
+    def set_selected_dir(self, path: Path) -> None:
+        """Store the selected directory as an absolute path and show it."""
+        # Resolved once here so the label never needs to call os.getcwd() again
+        self.selected_dir = path.absolute()
+        self.query_one("#current-dir", Label).update(f"Current: {self.selected_dir}")
+
     def refresh_directory_tree(self) -> None:
         """Refresh the directory tree with the new directory."""
         tree = self.query_one("#dir-tree", DirectoryTree)
+        # Assigning the path resets the root and reloads it, listing the directory
+        # in a worker thread; calling reload() as well would scan it a second time
         tree.path = str(self.selected_dir)
-        tree.reload()
-        current_dir_label = self.query_one("#current-dir", Label)
-        current_dir_label.update(f"Current: {self.selected_dir.absolute()}")
 
     def on_input_submitted(self, event: Input.Submitted) -> None:
         """Save file when Enter is pressed in the filename input."""
@@ -88,9 +92,7 @@ class SaveDialog(ModalScreen[tuple[str, str]]):
         self, event: DirectoryTree.DirectorySelected
     ) -> None:
         """Update selected directory when user clicks on a directory."""
-        self.selected_dir = event.path
-        current_dir_label = self.query_one("#current-dir", Label)
-        current_dir_label.update(f"Current: {self.selected_dir.absolute()}")
+        self.set_selected_dir(event.path)
 
     def action_cancel(self) -> None:
         """Cancel and close the dialog."""
@@ -145,6 +147,8 @@ class SaveDialog(ModalScreen[tuple[str, str]]):
 
 class TinyCompiledApp(App):
     CSS_PATH = "src/main.tcss"
+    # Seconds of typing inactivity before the editor contents are recompiled
+    COMPILE_DELAY = 0.15
     BINDINGS = [
         Binding("ctrl+r", "recompile", "Recompile", show=True),
         Binding("ctrl+s", "save", "Save File", show=True, priority=True),
@@ -153,6 +157,8 @@ class TinyCompiledApp(App):
     tc_code = var("")
     nasm_code = var("")
 
+    _compile_timer: Timer | None = None
+
     def compose(self) -> ComposeResult:
         self.editor = CustomTextArea(
             placeholder="Write TinyCompiled code here...",
@@ -175,16 +181,74 @@ class TinyCompiledApp(App):
         self.editor.focus()
 
     def on_text_area_changed(self, event: TextArea.Changed) -> None:
+        # The document text is only read once the timer fires: building it on every
+        # keystroke would copy the whole buffer per key press
         if event.text_area == self.editor:
-            self.tc_code = event.text_area.text
+            # Restart the countdown so a burst of keystrokes compiles only once
+            if self._compile_timer is not None:
+                self._compile_timer.stop()
+            self._compile_timer = self.set_timer(
+                self.COMPILE_DELAY, self._recompile_if_changed
+            )
+
+    def _recompile_if_changed(self) -> None:
+        """Recompile after a typing pause, unless the edits cancelled out (e.g. undo)."""
+        if self.editor.text != self.tc_code:
+            self.action_recompile()
 
     def action_recompile(self) -> None:
         """Recompile the current code."""
+        self.tc_code = self.editor.text
+        self._recompile_worker(self.tc_code)
+
+    @work(exclusive=True, thread=True)
+    def _recompile_worker(self, tc_code: str) -> None:
+        """Compile in a worker thread so large programs don't freeze the editor."""
+        # Imported here so loading the compiler never delays the first paint
+        from src import compile_tc_to_nasm
+
         try:
-            self.nasm_code = compile_tc_to_nasm(self.tc_code)
+            nasm_code = compile_tc_to_nasm(tc_code)
         except Exception as e:
-            self.nasm_code = f"Error during compilation:\n{e}"
-        self.output.load_text(self.nasm_code)
+            nasm_code = f"Error during compilation:\n{e}"
+
+        # A newer compile superseded this one while it was running
+        if get_current_worker().is_cancelled:
+            return
+        self.call_from_thread(self._show_nasm, nasm_code)
+
+    def _show_nasm(self, nasm_code: str) -> None:
+        """Display compiled output in the NASM pane."""
+        previous, self.nasm_code = self.nasm_code, nasm_code
+        if not previous:
+            # First result replaces the placeholder text
+            self.output.load_text(nasm_code)
+            return
+        if nasm_code == previous:
+            return
+
+        # An edit usually changes a few lines of output: replace only the span between
+        # the unchanged leading and trailing lines instead of reloading the whole pane
+        old_lines = previous.split("\n")
+        new_lines = nasm_code.split("\n")
+        limit = min(len(old_lines), len(new_lines)) - 1
+        head = 0
+        while head < limit and old_lines[head] == new_lines[head]:
+            head += 1
+        tail = 0
+        while tail < limit - head and old_lines[-1 - tail] == new_lines[-1 - tail]:
+            tail += 1
+
+        start = sum(len(line) + 1 for line in old_lines[:head])
+        tail_chars = sum(len(line) + 1 for line in old_lines[len(old_lines) - tail :])
+        document = self.output.document
+        self.output.replace(
+            nasm_code[start : len(nasm_code) - tail_chars],
+            document.get_location_from_index(start),
+            document.get_location_from_index(len(previous) - tail_chars),
+        )
+        # The pane is read-only, so there is nothing to undo
+        self.output.history.clear()
 
     def action_save(self) -> None:
         """Open save dialog."""
@@ -198,7 +262,9 @@ class TinyCompiledApp(App):
                 except Exception as e:
                     self.notify(f"Error saving file: {e}", severity="error")
 
-        self.push_screen(SaveDialog(self.tc_code, self.nasm_code), handle_save_result)
+        self.push_screen(
+            SaveDialog(self.editor.text, self.nasm_code), handle_save_result
+        )
 
 
 if __name__ == "__main__":
@@ -1,3 +1,3 @@
-from src.compiler.compiler import compile_tc_to_nasm
+from src.compiler.compiler import compile_tc_to_nasm, compile_tc_to_nasm_bytes
 
-__all__ = ['compile_tc_to_nasm']
+__all__ = ['compile_tc_to_nasm', 'compile_tc_to_nasm_bytes']
@@ -2,40 +2,40 @@ from dataclasses import dataclass
 from typing import List, Union, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class ASTNode: ...
 
 
-@dataclass
+@dataclass(slots=True)
 class Program(ASTNode):
     statements: List[ASTNode]
 
 
-@dataclass
+@dataclass(slots=True)
 class VarDecl(ASTNode):
     name: str
     value: Optional[int] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Load(ASTNode):
     dest: str  # register
     src: Union[str, int]  # register, identifier, or immediate
 
 
-@dataclass
+@dataclass(slots=True)
 class Set(ASTNode):
     dest: str  # identifier
     src: Union[str, int]  # register or immediate
 
 
-@dataclass
+@dataclass(slots=True)
 class Move(ASTNode):
     dest: str  # register
     src: str  # register
 
 
-@dataclass
+@dataclass(slots=True)
 class BinaryOp(ASTNode):
     op: str  # ADD, SUB, MUL, DIV, AND, OR, XOR
     dest: str  # register
@@ -43,13 +43,13 @@ class BinaryOp(ASTNode):
     right: Union[str, int]  # register or immediate
 
 
-@dataclass
+@dataclass(slots=True)
 class UnaryOp(ASTNode):
     op: str  # INC, DEC, NOT
     operand: str  # register or identifier
 
 
-@dataclass
+@dataclass(slots=True)
 class ShiftOp(ASTNode):
     op: str  # SHL, SHR
     dest: str  # register
@@ -57,36 +57,36 @@ class ShiftOp(ASTNode):
     count: int  # immediate
 
 
-@dataclass
+@dataclass(slots=True)
 class Function(ASTNode):
     name: str
     body: List[ASTNode]
 
 
-@dataclass
+@dataclass(slots=True)
 class Call(ASTNode):
     name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Return(ASTNode):
     value: Optional[str] = None  # register or None
 
 
-@dataclass
+@dataclass(slots=True)
 class Loop(ASTNode):
     var: str  # identifier
     limit: int
     body: List[ASTNode]
 
 
-@dataclass
+@dataclass(slots=True)
 class While(ASTNode):
     condition: "Condition"
     body: List[ASTNode]
 
 
-@dataclass
+@dataclass(slots=True)
 class For(ASTNode):
     var: str
     start: int
@@ -95,49 +95,49 @@ class For(ASTNode):
     body: List[ASTNode]
 
 
-@dataclass
+@dataclass(slots=True)
 class Repeat(ASTNode):
     body: List[ASTNode]
     condition: "Condition"
 
 
-@dataclass
+@dataclass(slots=True)
 class If(ASTNode):
     condition: "Condition"
     then_body: List[ASTNode]
     else_body: Optional[List[ASTNode]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Condition:
     left: Union[str, int]  # register, identifier, or immediate
     op: str  # ==, !=, >, <, >=, <=
     right: Union[str, int]  # register, identifier, or immediate
 
 
-@dataclass
+@dataclass(slots=True)
 class Push(ASTNode):
     register: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Pop(ASTNode):
     register: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Print(ASTNode):
     value: Union[str, int]  # register, identifier, or immediate
 
 
-@dataclass
+@dataclass(slots=True)
 class Input(ASTNode):
     dest: str  # register or identifier
 
-@dataclass
+@dataclass(slots=True)
 class Halt(ASTNode):
     pass
 
-@dataclass
+@dataclass(slots=True)
 class Nop(ASTNode):
     pass
\ No newline at end of file
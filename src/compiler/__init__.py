@@ -1 +1 @@
-from .compiler import compile_tc_to_nasm
\ No newline at end of file
+from .compiler import compile_tc_to_nasm, compile_tc_to_nasm_bytes
\ No newline at end of file
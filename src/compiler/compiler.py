@@ -1,41 +1,66 @@
 import os
+import sys
+from functools import lru_cache
 from src.lexer import Lexer
 from src.parser import Parser
 from src.generator import NasmGenerator
 
+# Read once at import rather than on every compile
+_DEBUG = os.environ.get("DEBUG", "").lower() in ("true", "1", "yes")
+
 
 def compile_tc_to_nasm(source_code: str, debug: bool | None = None) -> str:
     """Compile TinyCompiled source code to NASM assembly."""
     if debug is None:
-        debug = os.environ.get("DEBUG", "").lower() in ("true", "1", "yes")
+        debug = _DEBUG
+
+    # Debug runs print tokens and AST, so only plain compiles can be served from cache
+    if not debug:
+        return _compile_cached(source_code)
+    return _compile(source_code, debug)
+
+
+@lru_cache(maxsize=32)
+def _compile_cached(source_code: str) -> str:
+    """Compile without debug output, remembering recent results (compiling is pure)."""
+    return _compile(source_code, debug=False)
 
+
+def _compile(source_code: str, debug: bool) -> str:
+    """Run the lexer, parser and generator over the source."""
     # Lexical analysis
     lexer = Lexer(source_code)
     tokens = lexer.tokenize()
 
     if debug:
-        print("=== TOKENS ===")
-        for token in tokens:
-            print(f"  {token}")
-        print()
+        # Built up and written in one go, a print() per token is slow for big sources
+        lines = ["=== TOKENS ==="]
+        lines.extend(f"  {token}" for token in tokens)
+        sys.stdout.write("\n".join(lines) + "\n\n")
 
     # Syntax analysis
     parser = Parser(tokens)
     ast = parser.parse()
 
     if debug:
-        print("=== AST ===")
-        print(f"Program(")
-        print(f"  statements=[")
-        for i, stmt in enumerate(ast.statements):
-            comma = "," if i < len(ast.statements) - 1 else ""
-            print(f"    {stmt}{comma}")
-        print(f"  ]")
-        print(f")")
-        print()
+        lines = ["=== AST ===", "Program(", "  statements=["]
+        if ast.statements:
+            lines.append(",\n".join(f"    {stmt}" for stmt in ast.statements))
+        lines.extend(["  ]", ")"])
+        sys.stdout.write("\n".join(lines) + "\n\n")
 
     # Code generation
     generator = NasmGenerator()
     asm_code = generator.generate(ast)
 
     return asm_code
+
+
+def compile_tc_to_nasm_bytes(source: bytes, debug: bool | None = None) -> str:
+    """Compile TinyCompiled source read as raw bytes to NASM assembly."""
+    # Sources are almost always plain ASCII, which decodes faster than UTF-8
+    try:
+        source_code = source.decode("ascii")
+    except UnicodeDecodeError:
+        source_code = source.decode("utf-8")
+    return compile_tc_to_nasm(source_code, debug)
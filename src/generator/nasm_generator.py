@@ -1,5 +1,49 @@
+import io
+
 from src.ast import *
 
+_INDENT = "    "
+_NEWLINE_INDENT = "\n" + _INDENT
+
+# Fixed instructions, pre-indented and newline-terminated so they are written as is
+_NOP = "    nop\n"
+_PUSH_RDX = "    push rdx\n"
+_PUSH_RAX = "    push rax\n"
+_XOR_RDX_RDX = "    xor rdx, rdx\n"
+_POP_RAX = "    pop rax\n"
+_POP_RDX = "    pop rdx\n"
+_CALL_PRINT_INT = "    call print_int\n"
+_CALL_READ_INT = "    call read_int\n"
+_RET = "    ret\n"
+
+# Everything before the main code. main_code follows _start directly, so no jump is needed
+_TEXT_PROLOGUE = "section .text\n    global _start\n\n_start:\n"
+_DATA_HEADER = "section .data\n"
+_BSS_HEADER = "section .bss\n"
+
+
+def _fits_imm32(value: int) -> bool:
+    """Whether an instruction can take the value as a sign-extended 32-bit immediate"""
+    return -0x80000000 <= value <= 0x7FFFFFFF
+
+
+def _division_magic(divisor: int) -> tuple[int, int, bool]:
+    """Multiplier and shift that replace unsigned 64-bit division by a constant.
+
+    Returns (multiplier, shift, add_back). Without add_back the quotient is
+    high64(n * multiplier) >> shift; with it the multiplier needs 65 bits, so
+    t = high64(n * multiplier) and the quotient is (((n - t) >> 1) + t) >> shift.
+    """
+    # Granlund & Montgomery: pick the smallest 2^(64+s) <= m*d <= 2^(64+s) + 2^s
+    log2 = (divisor - 1).bit_length()  # ceil(log2(divisor))
+    for shift in range(log2 + 1):
+        power = 1 << (64 + shift)
+        multiplier = -(-power // divisor)
+        if multiplier >> 64 == 0 and multiplier * divisor - power <= 1 << shift:
+            return multiplier, shift, False
+    multiplier = (1 << 64) * ((1 << log2) - divisor) // divisor + 1
+    return multiplier, log2 - 1, True
+
 
 class NasmGenerator:
     """NASM x86-64 assembly code generator"""
@@ -14,10 +58,132 @@ class NasmGenerator:
     STDOUT = 1
 
     # Buffer sizes
-    DIGIT_BUFFER_SIZE = 20
+    DIGIT_BUFFER_SIZE = 21  # 19 digits, a sign and the newline
     INPUT_BUFFER_SIZE = 32
 
-    # Register mapping for virtual registers
+    # Fixed code blocks never change between programs, so their text is built once here
+    EXIT_ASM = f"    mov rax, {SYS_EXIT}\n    mov rdi, 0\n    syscall\n"
+
+    PRINT_INT_ASM = (
+        "\n"
+        "print_int:\n"
+        # Save the user registers that mul and the syscalls clobber. rbx (R2) is
+        # never touched, and r10/r11 are compiler scratch that no caller keeps live
+        "    push rax\n"  # R1
+        "    push rcx\n"  # R3
+        "    push rdx\n"  # R4
+        "    push rsi\n"  # R5
+        "    push rdi\n"  # R6
+        "\n"
+        # r15 contains the value to print (passed by caller)
+        # r10 = working value, r11 = reciprocal of 10, r12 = buffer pointer, r13 = sign mask
+        "    mov r10, r15\n"
+        "\n"
+        # Convert integer to string (reverse order in buffer), ending in the newline
+        # so the number and its line break go out in a single write
+        "    mov r11, 0xCCCCCCCCCCCCCCCD  ; ceil(2^67 / 10)\n"
+        f"    lea r12, [digit_buffer + {DIGIT_BUFFER_SIZE - 1}]\n"
+        "    mov byte [r12], 10\n"
+        "    dec r12\n"
+        "\n"
+        # Take the absolute value without a branch on the sign: the mask is all ones
+        # for negative values, and (x ^ mask) - mask negates only those
+        "    mov r13, r10\n"
+        "    sar r13, 63  ; sign mask: 0 or -1\n"
+        "    xor r10, r13\n"
+        "    sub r10, r13\n"
+        "\n"
+        # Convert digits, dividing by 10 with a multiply: the high half of
+        # value * ceil(2^67 / 10) shifted right by 3 is exactly value / 10, and
+        # mul is several times cheaper than div
+        ".digit:\n"
+        "    mov rax, r10\n"
+        "    mul r11  ; rdx = high half of the product\n"
+        "    shr rdx, 3  ; rdx = quotient\n"
+        "    lea rax, [rdx + rdx*4]\n"
+        "    add rax, rax  ; rax = quotient * 10\n"
+        "    sub r10, rax  ; r10 = remainder\n"
+        "    add r10b, '0'\n"
+        "    mov [r12], r10b\n"
+        "    mov r10, rdx  ; quotient back to r10\n"
+        "    dec r12\n"
+        "    test r10, r10\n"
+        "    jnz .digit\n"
+        "\n"
+        # Always write a minus sign in front, and only keep it (move the pointer
+        # past it) when the mask says the value was negative
+        "    mov byte [r12], '-'\n"
+        "    add r12, r13\n"
+        "\n"
+        # Print the string and newline - syscall clobbers rax, rdi, rsi, rdx but we don't care
+        "    inc r12  ; r12 = start of string\n"
+        f"    mov rdx, digit_buffer + {DIGIT_BUFFER_SIZE}\n"
+        "    sub rdx, r12  ; rdx = length\n"
+        "    mov rsi, r12  ; rsi = buffer pointer\n"
+        f"    mov rax, {SYS_WRITE}\n"
+        f"    mov rdi, {STDOUT}\n"
+        "    syscall\n"
+        "\n"
+        # Restore registers in reverse order (LIFO)
+        "    pop rdi\n"  # R6
+        "    pop rsi\n"  # R5
+        "    pop rdx\n"  # R4
+        "    pop rcx\n"  # R3
+        "    pop rax\n"  # R1
+        "\n"
+        "    ret\n"
+    )
+
+    READ_INT_ASM = (
+        "\n"
+        "read_int:\n"
+        # Read from stdin using syscall (clobbers rax, rdi, ssi, rdx but we don't care)
+        f"    mov rax, {SYS_READ}\n"
+        f"    mov rdi, {STDIN}\n"
+        "    lea rsi, [input_buffer]\n"
+        f"    mov rdx, {INPUT_BUFFER_SIZE}\n"
+        "    syscall\n"
+        "\n"
+        # Parse string to integer using scratch registers
+        # r10 = result accumulator, r12 = buffer pointer
+        # r13 = sign flag, r14 = temp for current digit
+        "    lea r12, [input_buffer]\n"
+        "    xor r10, r10  ; result = 0\n"
+        "    xor r13, r13  ; sign flag = 0\n"
+        "\n"
+        # Check for negative sign
+        "    movzx r14, byte [r12]\n"
+        "    cmp r14b, '-'\n"
+        "    jne .parse_loop\n"
+        "    mov r13, 1  ; set sign flag\n"
+        "    inc r12\n"
+        "\n"
+        # Parse digits: a single unsigned compare rejects anything outside '0'..'9',
+        # and two LEAs do result = result * 10 + digit without a multiply
+        ".parse_loop:\n"
+        "    movzx r14, byte [r12]\n"
+        "    sub r14d, '0'\n"
+        "    cmp r14d, 9\n"
+        "    ja .done\n"
+        "    lea r10, [r10 + r10*4]  ; result *= 5\n"
+        "    lea r10, [r14 + r10*2]  ; result = result * 2 + digit\n"
+        "    inc r12\n"
+        "    jmp .parse_loop\n"
+        "\n"
+        # Apply sign and return result in r15
+        ".done:\n"
+        "    mov r15, r10\n"
+        "    test r13, r13\n"
+        "    jz .return\n"
+        "    neg r15\n"
+        "\n"
+        ".return:\n"
+        "    ret\n"
+    )
+
+    # Register mapping for virtual registers. r10-r15 are reserved compiler scratch
+    # and must never be mapped here: print_int and constant DIV clobber r10/r11
+    # without saving them, which is only safe while no user register lives there
     REGISTER_MAP = {
         "R1": "rax",
         "R2": "rbx",
@@ -29,102 +195,211 @@ class NasmGenerator:
         "R8": "r9",
     }
 
+    # Two-operand instructions for binary ops (DIV needs rax/rdx and is handled apart)
+    BINARY_OP_MNEMONICS = {
+        "ADD": "add",
+        "SUB": "sub",
+        "MUL": "imul",
+        "AND": "and",
+        "OR": "or",
+        "XOR": "xor",
+    }
+    UNARY_OP_MNEMONICS = {"INC": "inc", "DEC": "dec", "NOT": "not"}
+    SHIFT_OP_MNEMONICS = {"SHL": "shl", "SHR": "shr"}
+
+    # Jump taken when a condition is false, i.e. the inverse of each comparison
+    FALSE_JUMPS = {
+        "==": "jne",
+        "!=": "je",
+        ">": "jle",
+        "<": "jge",
+        ">=": "jl",
+        "<=": "jg",
+    }
+
     def __init__(self):
-        self.data_section = []
-        self.bss_section = []
-        self.text_section = []
+        self.data_section = io.StringIO()
+        self.bss_section = io.StringIO()
+        self.text_section = io.StringIO()
         self.label_counter = 0
-        self.variables = {}
+        self.variables = set()
+        # Declared variables, rendered into the data and bss sections in one batch
+        self.data_variables = []  # (name, initial value)
+        self.bss_variables = []  # names
         self.needs_print_int = False
         self.needs_read_int = False
         self.functions = []
-
-    def get_register(self, reg: str) -> str:
-        """Convert virtual register name to actual x86-64 register"""
-        return self.REGISTER_MAP.get(reg, reg)
-
-    def is_register(self, operand: str) -> bool:
-        """Check if operand is a register"""
-        return operand in self.REGISTER_MAP
+        # Cleared when the generated code ends in a jmp or ret, so no exit is needed
+        self.falls_through = True
+
+        # Statement type -> code generator. Functions are emitted after the main code.
+        self._dispatch = {
+            Function: self.functions.append,
+            VarDecl: self.generate_var_decl,
+            Load: self.generate_load,
+            Set: self.generate_set,
+            Move: self.generate_move,
+            Print: self.generate_print,
+            Input: self.generate_input,
+            BinaryOp: self.generate_binary_op,
+            UnaryOp: self.generate_unary_op,
+            ShiftOp: self.generate_shift,
+            Halt: lambda stmt: self.generate_halt(),
+            Nop: lambda stmt: self.text_section.write(_NOP),
+            Call: self.generate_call,
+            Return: self.generate_return,
+            If: self.generate_if,
+            Loop: self.generate_loop,
+            While: self.generate_while,
+            For: self.generate_for,
+            Repeat: self.generate_repeat,
+            Push: self.generate_push,
+            Pop: self.generate_pop,
+        }
+
+    def _resolve(self, operand) -> tuple[bool, str]:
+        """Look up an operand once: (is it a register, x86-64 register or the operand)"""
+        reg = self.REGISTER_MAP.get(operand)
+        if reg is None:
+            return False, operand
+        return True, reg
+
+    def _operand(self, value) -> str:
+        """Format an immediate, register or variable as a source operand"""
+        if isinstance(value, int):
+            return str(value)
+        reg = self.REGISTER_MAP.get(value)
+        if reg is None:
+            return f"[{value}]"
+        return reg
 
     def emit_data(self, line: str):
         """Add a line to the data section"""
-        self.data_section.append(f"    {line}")
-
-    def emit_bss(self, line: str):
-        """Add a line to the bss section"""
-        self.bss_section.append(f"    {line}")
+        write = self.data_section.write
+        write(_INDENT)
+        write(line)
+        write("\n")
 
     def emit(self, instruction: str, indent: bool = True):
         """Add an instruction to the text section"""
-        prefix = "    " if indent else ""
-        self.text_section.append(f"{prefix}{instruction}")
+        # Written straight into one buffer, no per-line string is built or stored
+        write = self.text_section.write
+        if indent:
+            write(_INDENT)
+        write(instruction)
+        write("\n")
+
+    def emit_many(self, instructions):
+        """Add several indented instructions to the text section in one write"""
+        self.text_section.write(_INDENT + _NEWLINE_INDENT.join(instructions) + "\n")
 
     def emit_label(self, label: str):
         """Add a label to the text section"""
-        self.text_section.append(f"{label}:")
+        write = self.text_section.write
+        write(label)
+        write(":\n")
 
     def generate(self, ast: Program) -> str:
         """Generate NASM assembly code from AST"""
         self._initialize_sections()
         self._generate_program_body(ast)
+        self._remove_dead_code()
         self._finalize_program()
         return self._build_output()
 
     def _initialize_sections(self):
-        """Set up section headers"""
-        self.data_section.append("section .data")
-        self.bss_section.append("section .bss")
-        self.text_section.append("section .text")
-        self.emit(
-            "global _start",
-        )
-        self.text_section.append("")
-        self.emit_label("_start")
-        self.emit("jmp main_code")
+        """Start the text section with the entry point"""
+        self.text_section.write(_TEXT_PROLOGUE)
 
     def _generate_program_body(self, ast: Program):
         """Generate code for all statements in the program"""
         self.emit_label("main_code")
-        for stmt in ast.statements:
-            self.generate_statement(stmt)
+        self._generate_block(ast.statements)
         for func in self.functions:
             self.generate_function(func)
 
+    def _remove_dead_code(self):
+        """Peephole pass: drop jumps to the very next label, and instructions after
+        an unconditional jmp or ret that no label makes reachable again"""
+        lines = self.text_section.getvalue().split("\n")
+        kept = []
+        append = kept.append
+        reachable = True
+        pending_jump = None  # index in kept of a jmp followed by nothing but blank lines
+        for line in lines:
+            if not line:
+                append(line)
+            elif line[0] != " " and line[-1] == ":":
+                # A label: reachable again, and a jmp straight to it just falls through
+                if pending_jump is not None and kept[pending_jump][8:] == line[:-1]:
+                    del kept[pending_jump]
+                pending_jump = None
+                reachable = True
+                append(line)
+            elif reachable:
+                append(line)
+                if line.startswith("    jmp "):
+                    reachable = False
+                    pending_jump = len(kept) - 1
+                elif line == "    ret":
+                    reachable = False
+                else:
+                    pending_jump = None
+
+        self.falls_through = reachable
+        self.text_section = io.StringIO()
+        self.text_section.write("\n".join(kept))
+
     def _finalize_program(self):
-        """Add I/O buffers, exit code, and helper functions"""
+        """Add variables, I/O buffers, exit code, and helper functions"""
+        self._add_variables()
         self._add_io_buffers()
         self._add_exit_code()
         self._add_helper_functions()
 
+    def _add_variables(self):
+        """Declare all variables, one write per section"""
+        if self.data_variables:
+            self.data_section.write(
+                "".join(f"    {name} dq {value}\n" for name, value in self.data_variables)
+            )
+        if self.bss_variables:
+            self.bss_section.write(
+                "".join(f"    {name} resq 1\n" for name in self.bss_variables)
+            )
+
     def _add_io_buffers(self):
         """Add data buffers needed for I/O operations"""
         if self.needs_print_int:
-            self.emit_data("newline db 10")
             self.emit_data(f"digit_buffer times {self.DIGIT_BUFFER_SIZE} db 0")
         if self.needs_read_int:
             self.emit_data(f"input_buffer times {self.INPUT_BUFFER_SIZE} db 0")
 
     def _add_exit_code(self):
         """Add program exit syscall"""
-        self.emit(f"mov rax, {self.SYS_EXIT}")
-        self.emit("mov rdi, 0")
-        self.emit("syscall")
+        if self.falls_through:
+            self.text_section.write(self.EXIT_ASM)
 
     def _build_output(self) -> str:
         """Assemble final output from all sections"""
-        output = []
+        output = io.StringIO()
+        write = output.write
 
-        if len(self.data_section) > 1:
-            output.extend(self.data_section)
-            output.append("")
+        # Section headers are added here, and only for sections that have content
+        if self.data_section.tell():
+            write(_DATA_HEADER)
+            write(self.data_section.getvalue())
+            write("\n")
 
-        if len(self.bss_section) > 1:
-            output.extend(self.bss_section)
-            output.append("")
+        if self.bss_section.tell():
+            write(_BSS_HEADER)
+            write(self.bss_section.getvalue())
+            write("\n")
 
-        output.extend(self.text_section)
-        return "\n".join(output)
+        # Every text line ends in a newline; the output has none at the end
+        write(self.text_section.getvalue())
+        output.truncate(output.tell() - 1)
+        return output.getvalue()
 
     def _add_helper_functions(self):
         """Add helper functions for syscall-based I/O"""
@@ -136,210 +411,40 @@ class NasmGenerator:
     def _add_print_int_function(self):
         """Generate print_int helper: converts integer in r15 to string and prints it
         Takes argument in r15, uses only scratch registers r10-r15 to preserve user's R1-R8 registers
-        Note: We use rax, rbx, rdx, rsi, rdi, rcx, r11 internally, so we must save them"""
-        self.text_section.append("")
-        self.emit_label("print_int")
-
-        # Save all registers we will use (R1-R6 mapping)
-        self.emit("push rax")  # R1
-        self.emit("push rbx")  # R2
-        self.emit("push rcx")  # R3
-        self.emit("push rdx")  # R4
-        self.emit("push rsi")  # R5
-        self.emit("push rdi")  # R6
-        self.emit("push r11")  # scratch for divisor
-        self.text_section.append("")
-
-        # r15 contains the value to print (passed by caller)
-        # r10 = working value, r11 = divisor (10), r12 = buffer pointer, r13 = sign flag
-        self.emit("mov r10, r15")
-        self.text_section.append("")
-
-        # Convert integer to string (reverse order in buffer)
-        self.emit("mov r11, 10")
-        self.emit(f"lea r12, [digit_buffer + {self.DIGIT_BUFFER_SIZE - 1}]")
-        self.emit("mov byte [r12], 0")
-        self.emit("dec r12")
-        self.emit("xor r13, r13  ; sign flag")
-        self.text_section.append("")
-
-        # Handle negative numbers
-        self.emit("test r10, r10")
-        self.emit("jns .positive")
-        self.emit("neg r10")
-        self.emit("mov r13, 1")
-        self.text_section.append("")
-
-        # Convert digits - need to use rax/rdx for division
-        self.emit_label(".positive")
-        self.emit("mov rax, r10")
-        self.emit("xor rdx, rdx")
-        self.emit("div r11")
-        self.emit("mov r10, rax  ; quotient back to r10")
-        self.emit("add dl, '0'")
-        self.emit("mov [r12], dl")
-        self.emit("dec r12")
-        self.emit("test r10, r10")
-        self.emit("jnz .positive")
-        self.text_section.append("")
-
-        # Add minus sign if needed
-        self.emit("test r13, r13")
-        self.emit("jz .print")
-        self.emit("mov byte [r12], '-'")
-        self.emit("dec r12")
-        self.text_section.append("")
-
-        # Print the string - syscall clobbers rax, rdi, rsi, rdx but we don't care
-        self.emit_label(".print")
-        self.emit("inc r12  ; r12 = start of string")
-        self.emit(f"mov rdx, digit_buffer + {self.DIGIT_BUFFER_SIZE - 1}")
-        self.emit("sub rdx, r12  ; rdx = length")
-        self.emit("mov rsi, r12  ; rsi = buffer pointer")
-        self.emit(f"mov rax, {self.SYS_WRITE}")
-        self.emit(f"mov rdi, {self.STDOUT}")
-        self.emit("syscall")
-        self.text_section.append("")
-
-        # Print newline
-        self.emit(f"mov rax, {self.SYS_WRITE}")
-        self.emit(f"mov rdi, {self.STDOUT}")
-        self.emit("lea rsi, [newline]")
-        self.emit("mov rdx, 1")
-        self.emit("syscall")
-        self.text_section.append("")
-
-        # Restore registers in reverse order (LIFO)
-        self.emit("pop r11")
-        self.emit("pop rdi")  # R6
-        self.emit("pop rsi")  # R5
-        self.emit("pop rdx")  # R4
-        self.emit("pop rcx")  # R3
-        self.emit("pop rbx")  # R2
-        self.emit("pop rax")  # R1
-        self.text_section.append("")
-
-        self.emit("ret")
+        Note: We use rax, rdx, rsi, rdi, rcx internally, so we must save them"""
+        self.text_section.write(self.PRINT_INT_ASM)
 
     def _add_read_int_function(self):
         """Generate read_int helper: reads integer from stdin and returns it in r15
         Uses only scratch registers r10-r15 to preserve user's R1-R8 registers"""
-        self.text_section.append("")
-        self.emit_label("read_int")
-
-        # Read from stdin using syscall (clobbers rax, rdi, ssi, rdx but we don't care)
-        self.emit(f"mov rax, {self.SYS_READ}")
-        self.emit(f"mov rdi, {self.STDIN}")
-        self.emit("lea rsi, [input_buffer]")
-        self.emit(f"mov rdx, {self.INPUT_BUFFER_SIZE}")
-        self.emit("syscall")
-        self.text_section.append("")
-
-        # Parse string to integer using scratch registers
-        # r10 = result accumulator, r11 = multiplier (10), r12 = buffer pointer
-        # r13 = sign flag, r14 = temp for current digit
-        self.emit("lea r12, [input_buffer]")
-        self.emit("xor r10, r10  ; result = 0")
-        self.emit("xor r13, r13  ; sign flag = 0")
-        self.emit("mov r11, 10")
-        self.text_section.append("")
+        self.text_section.write(self.READ_INT_ASM)
 
-        # Check for negative sign
-        self.emit("movzx r14, byte [r12]")
-        self.emit("cmp r14b, '-'")
-        self.emit("jne .parse_loop")
-        self.emit("mov r13, 1  ; set sign flag")
-        self.emit("inc r12")
-        self.text_section.append("")
-
-        # Parse digits
-        self.emit_label(".parse_loop")
-        self.emit("movzx r14, byte [r12]")
-        self.emit("cmp r14b, '0'")
-        self.emit("jb .done")
-        self.emit("cmp r14b, '9'")
-        self.emit("ja .done")
-        self.emit("sub r14b, '0'")
-        self.emit("imul r10, r11  ; result *= 10")
-        self.emit("add r10, r14   ; result += digit")
-        self.emit("inc r12")
-        self.emit("jmp .parse_loop")
-        self.text_section.append("")
-
-        # Apply sign and return result in r15
-        self.emit_label(".done")
-        self.emit("mov r15, r10")
-        self.emit("test r13, r13")
-        self.emit("jz .return")
-        self.emit("neg r15")
-        self.text_section.append("")
-
-        self.emit_label(".return")
-        self.emit("ret")
+    def _generate_block(self, statements: list[ASTNode]):
+        """Generate code for a sequence of statements"""
+        generate = self.generate_statement  # looked up once, not per statement
+        for stmt in statements:
+            generate(stmt)
 
     def generate_statement(self, stmt: ASTNode):
-        if isinstance(stmt, Function):
-            self.functions.append(stmt)
-            return
-        elif isinstance(stmt, VarDecl):
-            self.generate_var_decl(stmt)
-        elif isinstance(stmt, Load):
-            self.generate_load(stmt)
-        elif isinstance(stmt, Set):
-            self.generate_set(stmt)
-        elif isinstance(stmt, Move):
-            self.generate_move(stmt)
-        elif isinstance(stmt, Print):
-            self.generate_print(stmt)
-        elif isinstance(stmt, Input):
-            self.generate_input(stmt)
-        elif isinstance(stmt, BinaryOp):
-            self.generate_binary_op(stmt)
-        elif isinstance(stmt, UnaryOp):
-            self.generate_unary_op(stmt)
-        elif isinstance(stmt, ShiftOp):
-            self.generate_shift(stmt)
-        elif isinstance(stmt, Halt):
-            self.generate_halt()
-        elif isinstance(stmt, Nop):
-            self.text_section.append("    nop")
-        elif isinstance(stmt, Call):
-            self.generate_call(stmt)
-        elif isinstance(stmt, Return):
-            self.generate_return(stmt)
-        elif isinstance(stmt, If):
-            self.generate_if(stmt)
-        elif isinstance(stmt, Loop):
-            self.generate_loop(stmt)
-        elif isinstance(stmt, While):
-            self.generate_while(stmt)
-        elif isinstance(stmt, For):
-            self.generate_for(stmt)
-        elif isinstance(stmt, Repeat):
-            self.generate_repeat(stmt)
-        elif isinstance(stmt, Push):
-            self.generate_push(stmt)
-        elif isinstance(stmt, Pop):
-            self.generate_pop(stmt)
+        # One dict lookup per node instead of walking an isinstance chain
+        handler = self._dispatch.get(type(stmt))
+        if handler is not None:
+            handler(stmt)
 
     def generate_unary_op(self, stmt: UnaryOp):
         """Generate unary operation instruction"""
-        if self.is_register(stmt.operand):
-            operand = self.get_register(stmt.operand)
-        else:
-            operand = f"qword [{stmt.operand}]"
+        is_reg, operand = self._resolve(stmt.operand)
+        if not is_reg:
+            operand = f"qword [{operand}]"
 
-        if stmt.op == "INC":
-            self.emit(f"inc {operand}")
-        elif stmt.op == "DEC":
-            self.emit(f"dec {operand}")
-        elif stmt.op == "NOT":
-            self.emit(f"not {operand}")
+        mnemonic = self.UNARY_OP_MNEMONICS.get(stmt.op)
+        if mnemonic is not None:
+            self.emit(f"{mnemonic} {operand}")
 
     def generate_shift(self, stmt: ShiftOp):
         """Generate shift operation instruction"""
-        dest = self.get_register(stmt.dest)
-        src = self.get_register(stmt.src)
+        _, dest = self._resolve(stmt.dest)
+        _, src = self._resolve(stmt.src)
         count = stmt.count
 
         # Move src to dest if not the same
@@ -347,50 +452,46 @@ class NasmGenerator:
             self.emit(f"mov {dest}, {src}")
 
         # Perform shift
-        if stmt.op == "SHL":
-            self.emit(f"shl {dest}, {count}")
-        elif stmt.op == "SHR":
-            self.emit(f"shr {dest}, {count}")
+        mnemonic = self.SHIFT_OP_MNEMONICS.get(stmt.op)
+        if mnemonic is not None:
+            self.emit(f"{mnemonic} {dest}, {count}")
 
     def generate_binary_op(self, stmt: BinaryOp):
         """Generate binary operation instruction"""
-        dest = self.get_register(stmt.dest)
-        left = self.get_register(stmt.left)
+        _, dest = self._resolve(stmt.dest)
+        _, left = self._resolve(stmt.left)
 
         # Determine right operand
-        if isinstance(stmt.right, int):
-            right_operand = str(stmt.right)
-        elif self.is_register(stmt.right):
-            right_operand = self.get_register(stmt.right)
-        else:
-            right_operand = f"[{stmt.right}]"
+        right_is_imm = isinstance(stmt.right, int)
+        right_operand = self._operand(stmt.right)
 
+        # DIV by a constant becomes a shift or a multiply by its reciprocal
+        if stmt.op == "DIV" and right_is_imm and 0 < stmt.right < 1 << 63:
+            self.generate_constant_division(dest, left, stmt.right)
         # DIV is special - it uses rax/rdx implicitly
-        if stmt.op == "DIV":
+        elif stmt.op == "DIV":
             # Always save rdx since DIV clobbers it
             if dest != "rdx":
-                self.emit("push rdx")
+                self.text_section.write(_PUSH_RDX)
 
             # Save rax if we'll clobber it and it's not the destination
             # This includes the case where left == rax but dest != rax
             save_rax = dest != "rax"
             if save_rax:
-                self.emit("push rax")
+                self.text_section.write(_PUSH_RAX)
 
             # Move dividend to rax if not already there
             if left != "rax":
                 self.emit(f"mov rax, {left}")
 
             # Clear rdx for unsigned division
-            self.emit("xor rdx, rdx")
+            self.text_section.write(_XOR_RDX_RDX)
 
             # Perform division
-            if isinstance(stmt.right, int):
-                # Immediate values need to go through a register
-                self.emit("push r10")
-                self.emit(f"mov r10, {stmt.right}")
-                self.emit("div r10")
-                self.emit("pop r10")
+            if right_is_imm:
+                # Immediate values need to go through a register; r10 is compiler
+                # scratch, so it does not need saving around the division
+                self.emit_many((f"mov r10, {stmt.right}", "div r10"))
             else:
                 self.emit(f"div {right_operand}")
 
@@ -400,64 +501,99 @@ class NasmGenerator:
 
             # Restore rax if we saved it
             if save_rax:
-                self.emit("pop rax")
+                self.text_section.write(_POP_RAX)
 
             # Restore rdx
             if dest != "rdx":
-                self.emit("pop rdx")
+                self.text_section.write(_POP_RDX)
         else:
             # For other operations, load left operand into destination register
             if dest != left:
                 self.emit(f"mov {dest}, {left}")
 
             # Generate operation
-            if stmt.op == "ADD":
-                self.emit(f"add {dest}, {right_operand}")
-            elif stmt.op == "SUB":
-                self.emit(f"sub {dest}, {right_operand}")
-            elif stmt.op == "MUL":
-                self.emit(f"imul {dest}, {right_operand}")
-            elif stmt.op == "AND":
-                self.emit(f"and {dest}, {right_operand}")
-            elif stmt.op == "OR":
-                self.emit(f"or {dest}, {right_operand}")
-            elif stmt.op == "XOR":
-                self.emit(f"xor {dest}, {right_operand}")
+            mnemonic = self.BINARY_OP_MNEMONICS.get(stmt.op)
+            if mnemonic is not None:
+                self.emit(f"{mnemonic} {dest}, {right_operand}")
+
+    def generate_constant_division(self, dest: str, left: str, divisor: int):
+        """Generate unsigned division by a positive constant without a div instruction"""
+        if divisor & (divisor - 1) == 0:
+            # Powers of two only need a shift, and leave rax/rdx alone
+            if dest != left:
+                self.emit(f"mov {dest}, {left}")
+            if divisor > 1:
+                self.emit(f"shr {dest}, {divisor.bit_length() - 1}")
+            return
+
+        multiplier, shift, add_back = _division_magic(divisor)
+        # The high half of the product lands in rdx and the low half in rax
+        if dest != "rdx":
+            self.text_section.write(_PUSH_RDX)
+        save_rax = dest != "rax"
+        if save_rax:
+            self.text_section.write(_PUSH_RAX)
+
+        if add_back:
+            # The dividend is needed again after mul, so keep it in r10
+            self.emit_many(
+                (
+                    f"mov r10, {left}",
+                    f"mov rax, {multiplier:#x}",
+                    "mul r10",
+                    "mov rax, r10",
+                    "sub rax, rdx",
+                    "shr rax, 1",
+                    "add rax, rdx",
+                )
+            )
+            quotient = "rax"
+        else:
+            if left == "rax":
+                self.emit_many((f"mov rdx, {multiplier:#x}", "mul rdx"))
+            else:
+                self.emit_many((f"mov rax, {multiplier:#x}", f"mul {left}"))
+            quotient = "rdx"
+        if shift:
+            self.emit(f"shr {quotient}, {shift}")
+        if dest != quotient:
+            self.emit(f"mov {dest}, {quotient}")
+
+        if save_rax:
+            self.text_section.write(_POP_RAX)
+        if dest != "rdx":
+            self.text_section.write(_POP_RDX)
 
     def generate_var_decl(self, stmt: VarDecl):
         """Generate variable declaration in data or bss section"""
-        self.variables[stmt.name] = True
+        self.variables.add(stmt.name)
         if stmt.value is not None:
-            self.emit_data(f"{stmt.name} dq {stmt.value}")
+            self.data_variables.append((stmt.name, stmt.value))
         else:
-            self.emit_bss(f"{stmt.name} resq 1")
+            self.bss_variables.append(stmt.name)
 
     def generate_load(self, stmt: Load):
         """Generate LOAD instruction: load value into register"""
-        dest = self.get_register(stmt.dest)
-
-        if isinstance(stmt.src, int):
-            self.emit(f"mov {dest}, {stmt.src}")
-        elif self.is_register(stmt.src):
-            self.emit(f"mov {dest}, {self.get_register(stmt.src)}")
-        else:
-            self.emit(f"mov {dest}, [{stmt.src}]")
+        _, dest = self._resolve(stmt.dest)
+        self.emit(f"mov {dest}, {self._operand(stmt.src)}")
 
     def generate_set(self, stmt: Set):
         """Generate SET instruction: store value to memory"""
         if isinstance(stmt.src, int):
             self.emit(f"mov qword [{stmt.dest}], {stmt.src}")
         else:
-            self.emit(f"mov qword [{stmt.dest}], {self.get_register(stmt.src)}")
+            _, src = self._resolve(stmt.src)
+            self.emit(f"mov qword [{stmt.dest}], {src}")
 
     def generate_move(self, stmt: Move):
         """Generate MOVE instruction: move value between registers or memory"""
-        dest = self.get_register(stmt.dest)
+        _, dest = self._resolve(stmt.dest)
         src = stmt.src
 
         # If src is a register, just move it directly
-        if self.is_register(src):
-            self.emit(f"mov {dest}, {self.get_register(src)}")
+        is_reg, src_reg = self._resolve(src)
+        if is_reg:
+            self.emit(f"mov {dest}, {src_reg}")
         else:
             # For memory or immediate values, move through a temporary register
             temp_reg = "r10"  # Use r10 as a temporary register
@@ -473,40 +609,33 @@ class NasmGenerator:
 
         # Load value to r15 (scratch register) to avoid clobbering R1-R8
         self._load_value_to_r15(stmt.value)
-        self.emit("call print_int")
+        self.text_section.write(_CALL_PRINT_INT)
 
     def generate_input(self, stmt: Input):
         """Generate INPUT instruction: read integer from stdin"""
         self.needs_read_int = True
 
-        self.emit("call read_int")
+        self.text_section.write(_CALL_READ_INT)
 
         # Store result from r15 (scratch register) to destination
-        if self.is_register(stmt.dest):
-            self.emit(f"mov {self.get_register(stmt.dest)}, r15")
+        is_reg, dest = self._resolve(stmt.dest)
+        if is_reg:
+            self.emit(f"mov {dest}, r15")
         else:
-            self.emit(f"mov [{stmt.dest}], r15")
+            self.emit(f"mov [{dest}], r15")
 
     def generate_halt(self):
         """Generate HALT instruction: exit program"""
-        self.emit(f"mov rax, {self.SYS_EXIT}")
-        self.emit("mov rdi, 0")
-        self.emit("syscall")
+        self.text_section.write(self.EXIT_ASM)
 
     def _load_value_to_r15(self, value):
         """Load a value (immediate, register, or variable) into r15 (scratch register)"""
-        if isinstance(value, int):
-            self.emit(f"mov r15, {value}")
-        elif self.is_register(value):
-            self.emit(f"mov r15, {self.get_register(value)}")
-        else:
-            self.emit(f"mov r15, [{value}]")
+        self.emit(f"mov r15, {self._operand(value)}")
 
     def generate_function(self, stmt: Function):
         """Generate function definition"""
         self.emit_label(f"{stmt.name}")
-        for s in stmt.body:
-            self.generate_statement(s)
+        self._generate_block(stmt.body)
 
     def generate_call(self, stmt: Call):
         """Generate function call"""
@@ -516,9 +645,10 @@ class NasmGenerator:
         """Generate return statement"""
         if stmt.value:
             # For now, assume value is a register, move to rax
-            if self.is_register(stmt.value):
-                self.emit(f"mov rax, {self.get_register(stmt.value)}")
-        self.emit("ret")
+            is_reg, value = self._resolve(stmt.value)
+            if is_reg:
+                self.emit(f"mov rax, {value}")
+        self.text_section.write(_RET)
 
     def generate_if(self, stmt: If):
         """Generate if-else-endif statement"""
@@ -528,52 +658,40 @@ class NasmGenerator:
 
         self.generate_condition(stmt.condition, else_label)
 
-        for s in stmt.then_body:
-            self.generate_statement(s)
+        self._generate_block(stmt.then_body)
 
         if stmt.else_body:
             self.emit(f"jmp {endif_label}")
             self.emit_label(else_label)
-            for s in stmt.else_body:
-                self.generate_statement(s)
+            self._generate_block(stmt.else_body)
             self.emit_label(endif_label)
         else:
             self.emit_label(else_label)
 
     def generate_condition(self, cond: Condition, false_label: str):
         """Generate condition evaluation and jump to false_label if condition is false"""
-        # Load left into r10
+        # Compare the operands in place where x86 allows it: cmp takes at most one
+        # memory operand, and an immediate only on the right and only if it fits 32 bits
+        left = self._operand(cond.left)
+        right = self._operand(cond.right)
         if isinstance(cond.left, int):
-            self.emit(f"mov r10, {cond.left}")
-        elif self.is_register(cond.left):
-            self.emit(f"mov r10, {self.get_register(cond.left)}")
-        else:
-            self.emit(f"mov r10, [{cond.left}]")
-
-        # Load right into r11
+            self.emit(f"mov r10, {left}")
+            left = "r10"
         if isinstance(cond.right, int):
-            self.emit(f"mov r11, {cond.right}")
-        elif self.is_register(cond.right):
-            self.emit(f"mov r11, {self.get_register(cond.right)}")
-        else:
-            self.emit(f"mov r11, [{cond.right}]")
-
-        # Compare
-        self.emit("cmp r10, r11")
+            if not _fits_imm32(cond.right):
+                self.emit(f"mov r11, {right}")
+                right = "r11"
+            elif left[0] == "[":
+                left = f"qword {left}"
+        elif left[0] == "[" and right[0] == "[":
+            self.emit(f"mov r11, {right}")
+            right = "r11"
+        self.emit(f"cmp {left}, {right}")
 
         # Jump based on op
-        if cond.op == "==":
-            self.emit(f"jne {false_label}")
-        elif cond.op == "!=":
-            self.emit(f"je {false_label}")
-        elif cond.op == ">":
-            self.emit(f"jle {false_label}")
-        elif cond.op == "<":
-            self.emit(f"jge {false_label}")
-        elif cond.op == ">=":
-            self.emit(f"jl {false_label}")
-        elif cond.op == "<=":
-            self.emit(f"jg {false_label}")
+        jump = self.FALSE_JUMPS.get(cond.op)
+        if jump is not None:
+            self.emit(f"{jump} {false_label}")
 
     def generate_loop(self, stmt: Loop):
         """Generate LOOP var, limit / ENDLOOP - loop while var < limit"""
@@ -585,21 +703,24 @@ class NasmGenerator:
         self.emit_label(start_label)
 
         # Compare var < limit
-        self.emit(f"mov r10, [{stmt.var}]")
-        self.emit(f"mov r11, {stmt.limit}")
-        self.emit("cmp r10, r11")
+        self._compare_var(stmt.var, stmt.limit)
         self.emit(f"jge {end_label}")
 
         # Body
-        for s in stmt.body:
-            self.generate_statement(s)
+        self._generate_block(stmt.body)
 
         # Increment var
-        self.emit(f"inc qword [{stmt.var}]")
-        self.emit(f"jmp {start_label}")
+        self.emit_many((f"inc qword [{stmt.var}]", f"jmp {start_label}"))
 
         self.emit_label(end_label)
 
+    def _compare_var(self, var: str, bound: int):
+        """Compare a loop variable in memory against a constant bound"""
+        if _fits_imm32(bound):
+            self.emit(f"cmp qword [{var}], {bound}")
+        else:
+            self.emit_many((f"mov r11, {bound}", f"cmp qword [{var}], r11"))
+
     def generate_while(self, stmt: While):
         """Generate WHILE condition / ENDWHILE - loop while condition is true"""
         start_label = f"while_start_{self.label_counter}"
@@ -611,8 +732,7 @@ class NasmGenerator:
         self.generate_condition(stmt.condition, end_label)
 
         # Body
-        for s in stmt.body:
-            self.generate_statement(s)
+        self._generate_block(stmt.body)
 
         self.emit(f"jmp {start_label}")
 
@@ -622,8 +742,8 @@ class NasmGenerator:
         """Generate FOR var FROM start TO end [STEP step] / ENDFOR - range loop"""
         # Declare the variable if not already declared
         if stmt.var not in self.variables:
-            self.variables[stmt.var] = True
-            self.emit_bss(f"{stmt.var} resq 1")
+            self.variables.add(stmt.var)
+            self.bss_variables.append(stmt.var)
 
         start_label = f"for_start_{self.label_counter}"
         end_label = f"for_end_{self.label_counter}"
@@ -635,19 +755,17 @@ class NasmGenerator:
         self.emit_label(start_label)
 
         # Compare based on step direction
-        self.emit(f"mov r10, [{stmt.var}]")
-        self.emit(f"mov r11, {stmt.end}")
-        self.emit("cmp r10, r11")
         if stmt.step > 0:
             # For ascending: loop while var <= end, exit if var > end
-            self.emit(f"jg {end_label}")
+            exit_jump = f"jg {end_label}"
         else:
             # For descending: loop while var >= end, exit if var < end
-            self.emit(f"jl {end_label}")
+            exit_jump = f"jl {end_label}"
+        self._compare_var(stmt.var, stmt.end)
+        self.emit(exit_jump)
 
         # Body
-        for s in stmt.body:
-            self.generate_statement(s)
+        self._generate_block(stmt.body)
 
         # Increment var by step
         if stmt.step == 1:
@@ -669,18 +787,17 @@ class NasmGenerator:
         self.emit_label(start_label)
 
         # Body
-        for s in stmt.body:
-            self.generate_statement(s)
+        self._generate_block(stmt.body)
 
         # Condition - if false, jump back
         self.generate_condition(stmt.condition, start_label)
 
     def generate_push(self, stmt: Push):
         """Generate PUSH register - Push register value onto stack"""
-        reg = self.get_register(stmt.register)
+        _, reg = self._resolve(stmt.register)
         self.emit(f"push {reg}")
 
     def generate_pop(self, stmt: Pop):
         """Generate POP register - Pop value from stack into register"""
-        reg = self.get_register(stmt.register)
+        _, reg = self._resolve(stmt.register)
         self.emit(f"pop {reg}")
@@ -1,6 +1,25 @@
+import re
+import sys
+
 from src.lexer.keyword import KEYWORD_DICT
 from src.lexer.token import TokenType, Token
 
+# Numbers and names are scanned by the regex engine rather than a Python loop per character
+_NUMBER_RE = re.compile(r"(-?)(?:0[xX]([0-9a-fA-F]*)|0[bB]([01]*)|(\d+))")
+_IDENTIFIER_RE = re.compile(r"\w+")  # letters, digits and underscores, as isalnum() or "_"
+
+REGISTER_NAMES = frozenset({"R1", "R2", "R3", "R4", "R5", "R6", "R7", "R8"})
+
+OPERATORS = {
+    "==": TokenType.EQ,
+    "!=": TokenType.NEQ,
+    ">=": TokenType.GTE,
+    "<=": TokenType.LTE,
+    ">": TokenType.GT,
+    "<": TokenType.LT,
+}
+_OPERATOR_CHARS = frozenset("".join(OPERATORS))
+
 
 class Lexer:
     def __init__(self, source_code):
@@ -14,191 +33,134 @@ class Lexer:
         self.keywords = KEYWORD_DICT
         self.tokens = []
 
-    def current_char(self):
-        if self.pos >= self.s_len:
-            return None
-        return self.source[self.pos]
-
-    def peek_char(self, offset=1):
-        if self.pos + offset >= self.s_len:
-            return None
-        return self.source[self.pos + offset]
-
-    def advance(self):
-        if self.pos >= self.s_len:
-            return
-
-        if self.current_char() == "\n":
-            self.line += 1
-            self.column = 1
-        else:
-            self.column += 1
-        self.pos += 1
-
     def skip_whitespace(self):
-        while (
-            self.current_char() is not None
-            and self.current_char().isspace()
-            and self.current_char() != "\n"
-        ):
-            self.advance()
+        src = self.source
+        n = self.s_len
+        pos = self.pos
+        while pos < n and src[pos] != "\n" and src[pos].isspace():
+            pos += 1
+        self.column += pos - self.pos
+        self.pos = pos
 
     def skip_comment(self):
-        if self.current_char() == ";":
-            while self.current_char() is not None and self.current_char() != "\n":
-                self.advance()
+        pos = self.pos
+        if pos < self.s_len and self.source[pos] == ";":
+            # Jump straight to the newline ending the comment (or the end of the source)
+            end = self.source.find("\n", pos)
+            if end < 0:
+                end = self.s_len
+            self.column += end - pos
+            self.pos = end
 
     def read_number(self) -> int:
-        start_col = self.column
-        num_str = ""
-
-        # Handle negative numbers
-        if self.current_char() == "-":
-            num_str += "-"
-            self.advance()
-
-        # Hexadecimal
-        if self.current_char() == "0" and self.peek_char() in "xX":
-            self.advance()  # skip 0
-            self.advance()  # skip x
-            while (
-                self.current_char() and self.current_char() in "0123456789abcdefABCDEF"
-            ):
-                num_str += self.current_char()
-                self.advance()
-            return int(num_str, 16) if num_str else 0
-
-        # Binary
-        if self.current_char() == "0" and self.peek_char() in "bB":
-            self.advance()  # skip 0
-            self.advance()  # skip b
-            while self.current_char() and self.current_char() in "01":
-                num_str += self.current_char()
-                self.advance()
-            return int(num_str, 2) if num_str else 0
-
-        # Decimal
-        while self.current_char() and self.current_char().isdigit():
-            num_str += self.current_char()
-            self.advance()
-
-        return int(num_str)
-
-    def _tokenize_operators(self): ...
+        match = _NUMBER_RE.match(self.source, self.pos)
+        sign, hex_digits, binary_digits, decimal_digits = match.groups()
+        self.column += match.end() - self.pos
+        self.pos = match.end()
+
+        # A bare 0x / 0b prefix reads as 0
+        if hex_digits is not None:
+            return int(sign + hex_digits, 16) if hex_digits else 0
+        if binary_digits is not None:
+            return int(sign + binary_digits, 2) if binary_digits else 0
+        return int(sign + decimal_digits)
+
+    def _tokenize_operators(self) -> bool:
+        """Add the comparison operator at the current position; False if there is none"""
+        pos = self.pos
+        text = self.source[pos : pos + 2]  # two-character operators take precedence
+        token_type = OPERATORS.get(text)
+        if token_type is None:
+            text = text[:1]
+            token_type = OPERATORS.get(text)
+            if token_type is None:
+                return False
+        self.tokens.append(Token(token_type, text, self.line, self.column))
+        self.pos += len(text)
+        self.column += len(text)
+        return True
 
     def read_identifier(self):
-        result = ""
-        while self.current_char() and (
-            self.current_char().isalnum() or self.current_char() == "_"
-        ):
-            result += self.current_char()
-            self.advance()
-        return result
+        match = _IDENTIFIER_RE.match(self.source, self.pos)
+        self.column += match.end() - self.pos
+        self.pos = match.end()
+        # Names repeat throughout a program; interned copies share one string and hash,
+        # and register names become the same objects as the generator's REGISTER_MAP keys
+        return sys.intern(match.group())
 
     def tokenize(self):
-        while self.pos < self.s_len:
+        # Hot loop: the source, its length and the token list are locals, and each
+        # character is read once by index
+        src = self.source
+        n = self.s_len
+        tokens = self.tokens
+        append = tokens.append
+        get_keyword = self.keywords.get
+        while self.pos < n:
             self.skip_whitespace()
-            current = self.current_char()
-
-            if current is None:
+            pos = self.pos
+            if pos >= n:
                 break
+            current = src[pos]
 
-            # Comments
-            if current == ";":
-                self.skip_comment()
-                continue
-
-            # Commas
-            if self.current_char() == ",":
-                self.tokens.append(Token(TokenType.COMMA, ",", self.line, self.column))
-                self.advance()
-                continue
+            # Identifiers, Keywords, Registers, Labels (the most common tokens, so first)
+            if current.isalpha() or current == "_":
+                ident = self.read_identifier()
 
-            # Newlines
-            if self.current_char() == "\n":
-                self.tokens.append(
-                    Token(TokenType.NEWLINE, "\n", self.line, self.column)
-                )
-                self.advance()
-                continue
+                # Check for label
+                if self.pos < n and src[self.pos] == ":":
+                    append(Token(TokenType.LABEL, ident, self.line, self.column))
+                    self.pos += 1  # skip :
+                    self.column += 1
+                    continue
 
-            # Numbers
-            if self.current_char().isdigit() or (
-                self.current_char() == "-"
-                and self.peek_char()
-                and self.peek_char().isdigit()
-            ):
-                num = self.read_number()
-                self.tokens.append(Token(TokenType.NUMBER, num, self.line, self.column))
-                continue
+                # Check for register
+                if ident in REGISTER_NAMES:
+                    append(Token(TokenType.REGISTER, ident, self.line, self.column))
+                    continue
 
-            # Operators
-            if self.current_char() == "=" and self.peek_char() == "=":
-                self.tokens.append(Token(TokenType.EQ, "==", self.line, self.column))
-                self.advance()
-                self.advance()
-                continue
+                # Check for keyword: one lookup, rather than a membership test and then an index
+                keyword_type = get_keyword(ident.upper())
+                if keyword_type is not None:
+                    append(Token(keyword_type, ident, self.line, self.column))
+                    continue
 
-            if self.current_char() == "!" and self.peek_char() == "=":
-                self.tokens.append(Token(TokenType.NEQ, "!=", self.line, self.column))
-                self.advance()
-                self.advance()
+                # Otherwise it's an identifier
+                append(Token(TokenType.IDENTIFIER, ident, self.line, self.column))
                 continue
 
-            if self.current_char() == ">" and self.peek_char() == "=":
-                self.tokens.append(Token(TokenType.GTE, ">=", self.line, self.column))
-                self.advance()
-                self.advance()
+            # Commas
+            if current == ",":
+                append(Token(TokenType.COMMA, ",", self.line, self.column))
+                self.pos += 1
+                self.column += 1
                 continue
 
-            if self.current_char() == "<" and self.peek_char() == "=":
-                self.tokens.append(Token(TokenType.LTE, "<=", self.line, self.column))
-                self.advance()
-                self.advance()
+            # Newlines: only statement separators to the parser, so a run of blank
+            # (or comment-only) lines yields one token, and leading ones yield none
+            if current == "\n":
+                if tokens and tokens[-1].type is not TokenType.NEWLINE:
+                    append(Token(TokenType.NEWLINE, "\n", self.line, self.column))
+                self.pos += 1
+                self.line += 1
+                self.column = 1
                 continue
 
-            if self.current_char() == ">":
-                self.tokens.append(Token(TokenType.GT, ">", self.line, self.column))
-                self.advance()
+            # Numbers (isdecimal() matches exactly the digits _NUMBER_RE accepts)
+            if current.isdecimal() or (
+                current == "-" and pos + 1 < n and src[pos + 1].isdecimal()
+            ):
+                num = self.read_number()
+                append(Token(TokenType.NUMBER, num, self.line, self.column))
                 continue
 
-            if self.current_char() == "<":
-                self.tokens.append(Token(TokenType.LT, "<", self.line, self.column))
-                self.advance()
+            # Operators
+            if current in _OPERATOR_CHARS and self._tokenize_operators():
                 continue
 
-            # Identifiers, Keywords, Registers, Labels
-            if self.current_char().isalpha() or self.current_char() == "_":
-                ident = self.read_identifier()
-
-                # Check for label
-                if self.current_char() == ":":
-                    self.tokens.append(
-                        Token(TokenType.LABEL, ident, self.line, self.column)
-                    )
-                    self.advance()  # skip :
-                    continue
-
-                # Check for register
-                if ident in ["R1", "R2", "R3", "R4", "R5", "R6", "R7", "R8"]:
-                    self.tokens.append(
-                        Token(TokenType.REGISTER, ident, self.line, self.column)
-                    )
-                    continue
-
-                # Check for keyword
-                if ident.upper() in self.keywords:
-                    self.tokens.append(
-                        Token(
-                            self.keywords[ident.upper()], ident, self.line, self.column
-                        )
-                    )
-                    continue
-
-                # Otherwise it's an identifier
-                self.tokens.append(
-                    Token(TokenType.IDENTIFIER, ident, self.line, self.column)
-                )
+            # Comments
+            if current == ";":
+                self.skip_comment()
                 continue
 
             raise SyntaxError(
@@ -69,7 +69,7 @@ class TokenType(Enum):
     EOF = auto()
 
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     type: TokenType
     value: Any
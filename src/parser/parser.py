@@ -1,26 +1,73 @@
 from src.lexer import Token, TokenType
 from src.ast.node import *
 
+# Operand-less statements are never modified after parsing, so every occurrence
+# shares one node instead of allocating its own
+_HALT = Halt()
+_NOP = Nop()
+_BARE_RETURN = Return()
+
 
 class Parser:
+    # Token groups tested on every statement, built once instead of per call.
+    # The value groups stay tuples: their order is used in error messages
+    VALUE_TYPES = (TokenType.REGISTER, TokenType.IDENTIFIER, TokenType.NUMBER)
+    REGISTER_OR_NUMBER = (TokenType.REGISTER, TokenType.NUMBER)
+    REGISTER_OR_IDENTIFIER = (TokenType.REGISTER, TokenType.IDENTIFIER)
+    COMPARISON_TYPES = frozenset(
+        {
+            TokenType.EQ,
+            TokenType.NEQ,
+            TokenType.GT,
+            TokenType.LT,
+            TokenType.GTE,
+            TokenType.LTE,
+        }
+    )
+
     def __init__(self, tokens: list[Token]):
         self.tokens = tokens
         self.pos = 0
         self.t_len = len(tokens)
 
-        # Dispatch table: maps token types to parser methods
+        # Dispatch table: maps each statement keyword to its parser method.
+        # Handlers are only reached through it, with the keyword already matched,
+        # so they step over the keyword with advance() rather than expect()
         self._statement_handlers = {
             TokenType.VAR: self.parse_var_decl,
             TokenType.LOAD: self.parse_load,
             TokenType.SET: self.parse_set,
             TokenType.PRINT: self.parse_print,
             TokenType.INPUT: self.parse_input,
-        }
-
-        # Simple statement handlers (no complex parsing)
-        self._simple_handlers = {
-            TokenType.HALT: lambda: Halt(),
-            TokenType.NOP: lambda: Nop(),
+            TokenType.HALT: self.parse_halt,
+            TokenType.NOP: self.parse_nop,
+            # Control flow and structured statements
+            TokenType.IF: self.parse_if,
+            TokenType.LOOP: self.parse_loop,
+            TokenType.WHILE: self.parse_while,
+            TokenType.FOR: self.parse_for,
+            TokenType.REPEAT: self.parse_repeat,
+            # Functions
+            TokenType.FUNC: self.parse_function,
+            TokenType.CALL: self.parse_call,
+            TokenType.RET: self.parse_return,
+            # Stack operations
+            TokenType.PUSH: self.parse_push,
+            TokenType.POP: self.parse_pop,
+            # Register operations
+            TokenType.MOVE: self.parse_move,
+            TokenType.NOT: self.parse_not,
+            TokenType.ADD: self.parse_binary_op,
+            TokenType.SUB: self.parse_binary_op,
+            TokenType.MUL: self.parse_binary_op,
+            TokenType.DIV: self.parse_binary_op,
+            TokenType.AND: self.parse_binary_op,
+            TokenType.OR: self.parse_binary_op,
+            TokenType.XOR: self.parse_binary_op,
+            TokenType.INC: self.parse_unary_op,
+            TokenType.DEC: self.parse_unary_op,
+            TokenType.SHL: self.parse_shift,
+            TokenType.SHR: self.parse_shift,
         }
 
     def current_token(self) -> Token:
@@ -37,119 +84,54 @@ class Parser:
         self.pos += 1
 
     def expect(self, expected: TokenType):
-        token = self.current_token()
-        if token.type != expected:
-            raise SyntaxError(
-                f"Expected token {expected}, but got {token.type} at line {token.line}, column {token.column}"
-            )
-        self.advance()
+        # Called several times per statement: index the list directly (the EOF
+        # token is never consumed) and keep the message building out of line
+        token = self.tokens[self.pos]
+        if token.type is not expected:
+            self._raise_expected(token, expected)
+        self.pos += 1
         return token
 
+    def _raise_expected(self, token: Token, expected: TokenType):
+        raise SyntaxError(
+            f"Expected token {expected}, but got {token.type} at line {token.line}, column {token.column}"
+        )
+
     def skip_newlines(self):
-        while self.current_token().type == TokenType.NEWLINE:
+        while self.current_token().type is TokenType.NEWLINE:
             self.advance()
 
     def parse(self):
-        ast = []
-        while self.current_token().type != TokenType.EOF:
-            stmt = self.parse_statement()
-            if stmt:
-                ast.append(stmt)
-            self.skip_newlines()
-
-        return Program(ast)
+        return Program(self._parse_body(TokenType.EOF))
 
     def parse_statement(self) -> Optional[ASTNode]:
         self.skip_newlines()
         token = self.current_token()
-        token_type = token.type
 
-        # Skip newlines
-        if token_type == TokenType.NEWLINE:
-            self.advance()
-            return None
+        # One lookup instead of testing every statement kind in turn
+        handler = self._statement_handlers.get(token.type)
+        if handler is None:
+            self._raise_unexpected(token)
+        return handler()
 
-        # Check direct dispatch table
-        if token_type in self._statement_handlers:
-            return self._statement_handlers[token_type]()
+    def _raise_unexpected(self, token: Token):
+        raise SyntaxError(f"Unexpected token {token.type} at line {token.line}")
 
-        # Check simple handlers (HALT, NOP)
-        if token_type in self._simple_handlers:
-            self.advance()
-            return self._simple_handlers[token_type]()
-
-        # Control flow and structured statements
-        if token_type == TokenType.IF:
-            return self.parse_if()
-        if token_type == TokenType.LOOP:
-            return self.parse_loop()
-        if token_type == TokenType.WHILE:
-            return self.parse_while()
-        if token_type == TokenType.FOR:
-            return self.parse_for()
-        if token_type == TokenType.REPEAT:
-            return self.parse_repeat()
-
-        # Functions
-        if token_type == TokenType.FUNC:
-            return self.parse_function()
-        if token_type == TokenType.CALL:
-            return self.parse_call()
-        if token_type == TokenType.RET:
-            return self.parse_return()
-
-        # Stack operations
-        if token_type == TokenType.PUSH:
-            return self.parse_push()
-        if token_type == TokenType.POP:
-            return self.parse_pop()
-
-        # Register operations
-        if token_type == TokenType.MOVE:
-            return self.parse_move()
-        if token_type == TokenType.NOT:
-            return self.parse_not()
-
-        # Binary operations
-        if token_type in [
-            TokenType.ADD,
-            TokenType.SUB,
-            TokenType.MUL,
-            TokenType.DIV,
-            TokenType.AND,
-            TokenType.OR,
-            TokenType.XOR,
-        ]:
-            return self.parse_binary_op()
-
-        # Unary operations
-        if token_type in [TokenType.INC, TokenType.DEC]:
-            return self.parse_unary_op()
-
-        # Shift operations
-        if token_type in [TokenType.SHL, TokenType.SHR]:
-            return self.parse_shift()
-
-        raise SyntaxError(f"Unexpected token {token_type} at line {token.line}")
-
-    def _parse_value(self, allowed_types=None):
+    def _parse_value(self, allowed_types=VALUE_TYPES):
         """
         Helper method to parse a value that can be a register, identifier, or number.
         Returns the parsed value.
 
         Args:
-            allowed_types: List of allowed TokenTypes. If None, allows REGISTER, IDENTIFIER, NUMBER
+            allowed_types: Tuple of allowed TokenTypes. Defaults to REGISTER, IDENTIFIER, NUMBER
         """
-        if allowed_types is None:
-            allowed_types = [TokenType.REGISTER, TokenType.IDENTIFIER, TokenType.NUMBER]
-
-        token = self.current_token()
-
+        token = self.tokens[self.pos]
         if token.type in allowed_types:
-            self.advance()
+            self.pos += 1
             return token.value
+        self._raise_expected_value(token, allowed_types)
 
-        # Build error message
+    def _raise_expected_value(self, token: Token, allowed_types):
         allowed_names = [t.name.lower() for t in allowed_types]
         expected = (
             ", ".join(allowed_names[:-1])
@@ -158,46 +140,57 @@ class Parser:
         )
         raise SyntaxError(f"Expected {expected} at line {token.line}")
 
-    def _parse_body(self, end_token: TokenType):
+    def _parse_body(self, end_token: TokenType, other_end: Optional[TokenType] = None):
         """
         Helper method to parse a body of statements until an end token is reached.
         Returns a list of parsed statements.
+
+        Args:
+            end_token: TokenType that closes the body
+            other_end: Optional second TokenType that also closes it (ELSE in an IF)
         """
+        # Runs once per statement: bind everything the loop touches to locals.
+        # The token list always ends with EOF and EOF is never consumed, so
+        # indexing it directly cannot run past the end
         body = []
-        while self.current_token().type != end_token:
-            stmt = self.parse_statement()
-            if stmt:
-                body.append(stmt)
-            self.skip_newlines()
+        append = body.append
+        tokens = self.tokens
+        parse_statement = self.parse_statement
+        skip_newlines = self.skip_newlines
+        while (token_type := tokens[self.pos].type) is not end_token and (
+            token_type is not other_end
+        ):
+            append(parse_statement())
+            skip_newlines()
         return body
 
     def parse_var_decl(self) -> VarDecl:
-        self.expect(TokenType.VAR)
+        self.advance()
         name = self.expect(TokenType.IDENTIFIER).value
 
         value = None
-        if self.current_token().type == TokenType.COMMA:
+        if self.current_token().type is TokenType.COMMA:
             self.advance()
             value = self.expect(TokenType.NUMBER).value
 
         return VarDecl(name, value)
 
     def parse_load(self) -> Load:
-        self.expect(TokenType.LOAD)
+        self.advance()
         dest = self.expect(TokenType.REGISTER).value
         self.expect(TokenType.COMMA)
         src = self._parse_value()
         return Load(dest, src)
 
     def parse_set(self) -> Set:
-        self.expect(TokenType.SET)
+        self.advance()
         dest = self.expect(TokenType.IDENTIFIER).value
         self.expect(TokenType.COMMA)
-        src = self._parse_value([TokenType.REGISTER, TokenType.NUMBER])
+        src = self._parse_value(self.REGISTER_OR_NUMBER)
         return Set(dest, src)
 
     def parse_move(self) -> Move:
-        self.expect(TokenType.MOVE)
+        self.advance()
         dest = self.expect(TokenType.REGISTER).value
         self.expect(TokenType.COMMA)
         src = self.expect(TokenType.REGISTER).value
@@ -212,7 +205,7 @@ class Parser:
         self.expect(TokenType.COMMA)
         left = self.expect(TokenType.REGISTER).value
         self.expect(TokenType.COMMA)
-        right = self._parse_value([TokenType.REGISTER, TokenType.NUMBER])
+        right = self._parse_value(self.REGISTER_OR_NUMBER)
 
         return BinaryOp(op, dest, left, right)
 
@@ -220,11 +213,11 @@ class Parser:
         op_token = self.current_token()
         op = op_token.value.upper()
         self.advance()
-        operand = self._parse_value([TokenType.REGISTER, TokenType.IDENTIFIER])
+        operand = self._parse_value(self.REGISTER_OR_IDENTIFIER)
         return UnaryOp(op, operand)
 
     def parse_not(self) -> UnaryOp:
-        self.expect(TokenType.NOT)
+        self.advance()
         operand = self.expect(TokenType.REGISTER).value
         return UnaryOp("NOT", operand)
 
@@ -242,7 +235,7 @@ class Parser:
         return ShiftOp(op, dest, src, count)
 
     def parse_function(self) -> Function:
-        self.expect(TokenType.FUNC)
+        self.advance()
         name = self.expect(TokenType.IDENTIFIER).value
         self.skip_newlines()
         body = self._parse_body(TokenType.ENDFUNC)
@@ -250,42 +243,36 @@ class Parser:
         return Function(name, body)
 
     def parse_call(self) -> Call:
-        self.expect(TokenType.CALL)
+        self.advance()
         name = self.expect(TokenType.IDENTIFIER).value
         return Call(name)
 
     def parse_return(self) -> Return:
-        self.expect(TokenType.RET)
+        self.advance()
 
-        if self.current_token().type == TokenType.REGISTER:
+        if self.current_token().type is TokenType.REGISTER:
             value = self.expect(TokenType.REGISTER).value
             return Return(value)
 
-        return Return()
+        return _BARE_RETURN
 
     def parse_condition(self) -> Condition:
         left = self._parse_value()
 
-        op_token = self.current_token()
-        if op_token.type in [
-            TokenType.EQ,
-            TokenType.NEQ,
-            TokenType.GT,
-            TokenType.LT,
-            TokenType.GTE,
-            TokenType.LTE,
-        ]:
-            op = op_token.value
-            self.advance()
-        else:
-            raise SyntaxError(f"Expected comparison operator at line {op_token.line}")
+        op_token = self.tokens[self.pos]
+        if op_token.type not in self.COMPARISON_TYPES:
+            self._raise_expected_comparison(op_token)
+        self.pos += 1
 
         right = self._parse_value()
 
-        return Condition(left, op, right)
+        return Condition(left, op_token.value, right)
+
+    def _raise_expected_comparison(self, token: Token):
+        raise SyntaxError(f"Expected comparison operator at line {token.line}")
 
     def parse_loop(self) -> Loop:
-        self.expect(TokenType.LOOP)
+        self.advance()
         var = self.expect(TokenType.IDENTIFIER).value
         self.expect(TokenType.COMMA)
         limit = self.expect(TokenType.NUMBER).value
@@ -295,7 +282,7 @@ class Parser:
         return Loop(var, limit, body)
 
     def parse_while(self) -> While:
-        self.expect(TokenType.WHILE)
+        self.advance()
         condition = self.parse_condition()
         self.skip_newlines()
         body = self._parse_body(TokenType.ENDWHILE)
@@ -303,7 +290,7 @@ class Parser:
         return While(condition, body)
 
     def parse_for(self) -> For:
-        self.expect(TokenType.FOR)
+        self.advance()
         var = self.expect(TokenType.IDENTIFIER).value
         self.expect(TokenType.FROM)
         start = self.expect(TokenType.NUMBER).value
@@ -311,7 +298,7 @@ class Parser:
         end = self.expect(TokenType.NUMBER).value
 
         step = 1
-        if self.current_token().type == TokenType.STEP:
+        if self.current_token().type is TokenType.STEP:
             self.advance()
             step = self.expect(TokenType.NUMBER).value
 
@@ -321,7 +308,7 @@ class Parser:
         return For(var, start, end, step, body)
 
     def parse_repeat(self) -> Repeat:
-        self.expect(TokenType.REPEAT)
+        self.advance()
         self.skip_newlines()
         body = self._parse_body(TokenType.UNTIL)
         self.expect(TokenType.UNTIL)
@@ -330,20 +317,14 @@ class Parser:
         return Repeat(body, condition)
 
     def parse_if(self) -> If:
-        self.expect(TokenType.IF)
+        self.advance()
         condition = self.parse_condition()
         self.skip_newlines()
 
-        # Parse then body - need special handling for ELSE/ENDIF
-        then_body = []
-        while self.current_token().type not in [TokenType.ELSE, TokenType.ENDIF]:
-            stmt = self.parse_statement()
-            if stmt:
-                then_body.append(stmt)
-            self.skip_newlines()
+        then_body = self._parse_body(TokenType.ENDIF, TokenType.ELSE)
 
         else_body = None
-        if self.current_token().type == TokenType.ELSE:
+        if self.current_token().type is TokenType.ELSE:
             self.advance()
             self.skip_newlines()
             else_body = self._parse_body(TokenType.ENDIF)
@@ -351,22 +332,30 @@ class Parser:
         self.expect(TokenType.ENDIF)
         return If(condition, then_body, else_body)
 
+    def parse_halt(self) -> Halt:
+        self.advance()
+        return _HALT
+
+    def parse_nop(self) -> Nop:
+        self.advance()
+        return _NOP
+
     def parse_push(self) -> Push:
-        self.expect(TokenType.PUSH)
+        self.advance()
         register = self.expect(TokenType.REGISTER).value
         return Push(register)
 
     def parse_pop(self) -> Pop:
-        self.expect(TokenType.POP)
+        self.advance()
         register = self.expect(TokenType.REGISTER).value
         return Pop(register)
 
     def parse_print(self) -> Print:
-        self.expect(TokenType.PRINT)
+        self.advance()
         value = self._parse_value()
         return Print(value)
 
     def parse_input(self) -> Input:
-        self.expect(TokenType.INPUT)
-        dest = self._parse_value([TokenType.REGISTER, TokenType.IDENTIFIER])
+        self.advance()
+        dest = self._parse_value(self.REGISTER_OR_IDENTIFIER)
         return Input(dest)
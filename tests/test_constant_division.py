@@ -0,0 +1,103 @@
+import unittest
+
+from src.compiler import compile_tc_to_nasm
+from src.generator.nasm_generator import _division_magic
+
+MASK64 = (1 << 64) - 1
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+# DIV is unsigned (xor rdx, rdx; div), so negative dividends divide as their bit patterns
+DIVIDENDS = [
+    0,
+    1,
+    2,
+    3,
+    6,
+    7,
+    9,
+    10,
+    1000,
+    INT64_MAX,
+    INT64_MAX - 1,
+    INT64_MIN,
+    INT64_MIN + 1,
+    -1,
+    -2,
+    -3,
+    -7,
+    -10,
+    -1000,
+]
+
+# Divisors below 2^63 that are not powers of two, which take the magic-number path
+MAGIC_DIVISORS = [3, 5, 6, 7, 10, 11, 25, 100, 641, 1000, 12345, (1 << 62) + 1, INT64_MAX]
+
+# Powers of two are compiled to a shift instead
+POWER_OF_TWO_DIVISORS = [1, 2, 4, 1 << 31, 1 << 62]
+
+
+def emulate_magic_division(n: int, divisor: int) -> int:
+    """Evaluate the mul/shift sequence emitted for n / divisor on 64-bit registers"""
+    multiplier, shift, add_back = _division_magic(divisor)
+    high = (n * multiplier) >> 64
+    if add_back:
+        return ((((n - high) & MASK64) >> 1) + high) >> shift
+    return high >> shift
+
+
+class DivisionMagicTest(unittest.TestCase):
+    def test_multiplier_fits_in_64_bits(self):
+        for divisor in MAGIC_DIVISORS:
+            with self.subTest(divisor=divisor):
+                multiplier, shift, _ = _division_magic(divisor)
+                self.assertLess(multiplier, 1 << 64)
+                self.assertGreaterEqual(shift, 0)
+
+    def test_matches_unsigned_division(self):
+        for divisor in MAGIC_DIVISORS:
+            for dividend in DIVIDENDS + [divisor - 1, divisor, divisor + 1, 2 * divisor]:
+                n = dividend & MASK64
+                with self.subTest(dividend=dividend, divisor=divisor):
+                    self.assertEqual(emulate_magic_division(n, divisor), n // divisor)
+
+    def test_matches_division_by_small_divisors_exhaustively(self):
+        for divisor in range(3, 200):
+            if divisor & (divisor - 1) == 0:
+                continue
+            for n in (*range(0, 4 * divisor), MASK64, MASK64 - divisor, 1 << 63):
+                with self.subTest(dividend=n, divisor=divisor):
+                    self.assertEqual(emulate_magic_division(n, divisor), n // divisor)
+
+
+class ConstantDivisionCodegenTest(unittest.TestCase):
+    def compile_div(self, divisor: int) -> str:
+        return compile_tc_to_nasm(f"DIV R2, R3, {divisor}\n", debug=False)
+
+    def test_power_of_two_becomes_shift(self):
+        for divisor in POWER_OF_TWO_DIVISORS:
+            with self.subTest(divisor=divisor):
+                asm = self.compile_div(divisor)
+                self.assertNotIn("div ", asm)
+                self.assertNotIn("mul ", asm)
+                self.assertIn("mov rbx, rcx", asm)
+                if divisor == 1:
+                    self.assertNotIn("shr", asm)
+                else:
+                    self.assertIn(f"shr rbx, {divisor.bit_length() - 1}", asm)
+
+    def test_other_divisors_use_magic_multiplier(self):
+        for divisor in MAGIC_DIVISORS:
+            with self.subTest(divisor=divisor):
+                asm = self.compile_div(divisor)
+                multiplier, _, _ = _division_magic(divisor)
+                self.assertNotIn("div ", asm)
+                self.assertIn(f"mov rax, {multiplier:#x}", asm)
+
+    def test_divisor_above_int64_max_keeps_div(self):
+        asm = self.compile_div(1 << 63)
+        self.assertIn("div r10", asm)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import io
+import unittest
+
+from src.compiler import compile_tc_to_nasm
+from src.generator import NasmGenerator
+
+PROLOGUE = "section .text\n    global _start\n\n_start:\nmain_code:\n"
+EXIT = "    mov rax, 60\n    mov rdi, 0\n    syscall"
+
+
+def compile_source(source: str) -> str:
+    return compile_tc_to_nasm(source, debug=False)
+
+
+class RemoveDeadCodeTest(unittest.TestCase):
+    def test_code_after_ret_is_dropped(self):
+        source = "FUNC f\n  RET R1\n  LOAD R2, 5\nENDFUNC\nCALL f\nHALT\n"
+        expected = PROLOGUE + "    call f\n" + EXIT + "\nf:\n    mov rax, rax\n    ret"
+        self.assertEqual(compile_source(source), expected)
+
+    def test_labels_after_ret_stay_reachable(self):
+        source = (
+            "FUNC f\n"
+            "  IF R1 == 1\n    RET R1\n  ELSE\n    RET R2\n  ENDIF\n"
+            "  LOAD R3, 7\n"
+            "ENDFUNC\n"
+            "CALL f\n"
+            "HALT\n"
+        )
+        expected = (
+            PROLOGUE
+            + "    call f\n"
+            + EXIT
+            + "\nf:\n"
+            "    cmp rax, 1\n"
+            "    jne else_0\n"
+            "    mov rax, rax\n"
+            "    ret\n"
+            # The jmp to endif_0 after the ret is dropped, both labels are kept
+            "else_0:\n"
+            "    mov rax, rbx\n"
+            "    ret\n"
+            "endif_0:\n"
+            "    mov rcx, 7\n" + EXIT
+        )
+        self.assertEqual(compile_source(source), expected)
+
+    def test_loop_back_edge_and_exit_label_are_kept(self):
+        source = "WHILE R1 > 0\n  DEC R1\nENDWHILE\n"
+        expected = (
+            PROLOGUE
+            + "while_start_0:\n"
+            "    cmp rax, 0\n"
+            "    jle while_end_0\n"
+            "    dec rax\n"
+            "    jmp while_start_0\n"
+            "while_end_0:\n" + EXIT
+        )
+        self.assertEqual(compile_source(source), expected)
+
+    def test_jump_over_else_is_kept(self):
+        source = "IF R1 == 1\n  LOAD R2, 2\nELSE\n  LOAD R2, 3\nENDIF\n"
+        expected = (
+            PROLOGUE
+            + "    cmp rax, 1\n"
+            "    jne else_0\n"
+            "    mov rbx, 2\n"
+            "    jmp endif_0\n"
+            "else_0:\n"
+            "    mov rbx, 3\n"
+            "endif_0:\n" + EXIT
+        )
+        self.assertEqual(compile_source(source), expected)
+
+    def test_no_exit_after_trailing_ret(self):
+        source = "FUNC f\n  RET\nENDFUNC\nCALL f\nHALT\n"
+        self.assertTrue(compile_source(source).endswith("f:\n    ret"))
+
+    def run_pass(self, text: str) -> tuple[str, bool]:
+        """Run the peephole pass alone over hand-written text"""
+        generator = NasmGenerator()
+        generator.text_section = io.StringIO(text)
+        generator._remove_dead_code()
+        return generator.text_section.getvalue(), generator.falls_through
+
+    def test_jump_to_next_label_is_dropped(self):
+        text, falls_through = self.run_pass(
+            "main_code:\n    mov rax, 1\n    jmp next\n\nnext:\n    mov rbx, 2\n"
+        )
+        self.assertEqual(text, "main_code:\n    mov rax, 1\n\nnext:\n    mov rbx, 2\n")
+        self.assertTrue(falls_through)
+
+    def test_jump_to_later_label_drops_code_up_to_next_label(self):
+        text, falls_through = self.run_pass(
+            "main_code:\n"
+            "    jmp done\n"
+            "    mov rax, 1\n"
+            "    ret\n"
+            "skipped:\n"
+            "    mov rbx, 2\n"
+            "    jmp skipped\n"
+            "done:\n"
+            "    nop\n"
+            "    ret\n"
+            "    mov rcx, 3\n"
+        )
+        self.assertEqual(
+            text,
+            "main_code:\n"
+            "    jmp done\n"
+            "skipped:\n"
+            "    mov rbx, 2\n"
+            "    jmp skipped\n"
+            "done:\n"
+            "    nop\n"
+            "    ret\n",
+        )
+        self.assertFalse(falls_through)
+
+
+if __name__ == "__main__":
+    unittest.main()